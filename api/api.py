@@ -1,65 +1,139 @@
 """
 This is deployed as a lambda function in AWS.
 """
-import decimal
-from distutils.util import strtobool
+import base64
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
+import gzip
+import hashlib
 import itertools
 import json
+import math
 from pathlib import Path
+import random
+import threading
+import time
 
-import boto3
-from boto3.dynamodb.conditions import Key
+try:
+    import brotli  # <- optional, e.g. from a lambda layer
+except ImportError:
+    brotli = None
+try:
+    import orjson  # <- optional, but much faster at encoding
+except ImportError:
+    orjson = None
+
+from cache import Cache, env_mb, env_seconds, log_stats
+from postings import Postings
+from store import StrongsIndex, open_store
 
 
 print("Loading function")
-dynamodb = boto3.resource("dynamodb")
-bibles_table = dynamodb.Table("B3Bibles")
-search_table = dynamodb.Table("B3Search")
 
 resources_dir = Path(__file__).parent / "resources"
+verse_store = open_store(resources_dir / "verses.b3v")  # <- only there if built with --with-verses
+
+_MAX_VERSES = 1000  # <- most verses fetched by a single search
+_MAX_VERSES_BYTES = 3 * 1024 * 1024  # <- lambda allows 6MB, and escapes the body again in its own json
+_TRANSLATION_BYTES = 1600  # <- rough json size of a verse in one translation (Ps.119 is ~10.9KB in all seven)
+_FIELD_SHARES = {"text": 0.45, "type": 0.2, "strongs": 0.15, "tlit": 0.2}  # <- of those bytes
+_BATCH_GET_SIZE = 100  # <- most keys dynamodb will take in one batch_get_item
+_BATCH_GET_ATTEMPTS = 8
+executor = ThreadPoolExecutor(max_workers=_MAX_VERSES // _BATCH_GET_SIZE)
+
+# Translations (each a top-level attribute of a verse item) and their languages
+_TRANSLATIONS = {"ASV": "en", "KJV": "en", "WEB": "en", "WMB": "en", "WLC": "he", "LXX": "gr", "TISCH": "gr"}
+_TOKEN_FIELDS = {"text", "type", "strongs", "tlit"}
+_MAX_STRONGS_IDS = 500
+
+# How long clients and CDNs can cache each kind of response (they revalidate with the ETag)
+_CACHE_STATIC = "public, max-age=86400"
+_CACHE_SEARCH = "public, max-age=3600"
+_MIN_COMPRESS_BYTES = 1024  # <- not worth compressing smaller bodies
+
+# Cache sizes (MB) and times-to-live (seconds) can be tuned with environment variables
+_CACHE_TTL = env_seconds("B3_CACHE_TTL", 3600)
+_NEGATIVE_CACHE_TTL = env_seconds("B3_NEGATIVE_CACHE_TTL", 60)
+_CHAPTER_CACHE_BYTES = env_mb("B3_CHAPTER_CACHE_MB", 64)
+_REFERENCE_CACHE_BYTES = env_mb("B3_REFERENCE_CACHE_MB", 16)
+_FRAGMENT_CACHE_BYTES = env_mb("B3_FRAGMENT_CACHE_MB", 32)
+store_cache = Cache("store", env_mb("B3_STORE_CACHE_MB", 64), ttl=math.inf)  # <- the store never changes
 
 
 def handler(event, context):
     """
     Handles all API calls for barebonesbible.com.
     """
+    try:
+        return _negotiate(_handle(event), event.get("headers") or {})
+    finally:
+        log_stats()
+
+
+def _handle(event):
     path = event["path"]
-    query = event["queryStringParameters"]
+    query = event["queryStringParameters"] or {}
     print(f"Received path={path} and query={query}")
 
     root, *parts = path.strip("/").split("/")
     if root not in {"books", "search", "strongs"}:
         return _response(404, {"message": f"Invalid resource '{root}'"})
 
-    # 1. User has requested /strongs
+    # 1. User has requested /strongs, /strongs/{id} or /strongs?ids=...
     if root == "strongs":
-        return _response(200, resource("strongs"))
+        return _handle_strongs(parts, query)
+
+    # Only get some translations and/or token fields?
+    try:
+        translations, fields = _selection(query)
+    except ValueError as e:
+        return _response(400, {"message": str(e)})
 
     # 2. User is searching on a term
     if root == "search":
-        result = _handle_search(query)
+        result = _handle_search(query, translations, fields)
         code = 404 if "error" in result else 200
-        return _response(code, result)
+        return _response(code, result, cache_control=_CACHE_SEARCH)
     
     # 3. User has requested /books
     books = resource("books")
     if not parts:
-        return _response(200, _books_by_collection(books))
+        return _response(200, _books_by_collection(books), cache_control=_CACHE_STATIC)
         
     # 4. User has requested /books/{code}
     if len(parts) == 1 and parts[0] in books:
-        return _response(200, books[parts[0]])
+        return _response(200, books[parts[0]], cache_control=_CACHE_STATIC)
         
     # 5. User has requested /books/{code}/{start}/{end}
     if len(parts) == 3 and parts[0] in books and is_cv(parts[1]) and is_cv(parts[2]):
-        result = {"verses": _fetch_verses(parts)}
-        return _response(200, result)
+        if translations is None and fields is None:
+            # Splice together the already-encoded verses
+            body = ",".join(itertools.chain.from_iterable(executor.map(
+                lambda query: _chapter_fragments(*query), _chapter_queries(parts),
+            )))
+            return _response(200, RawJSON(f'{{"verses":[{body}]}}'), cache_control=_CACHE_STATIC)
+        verses = _fetch_verses(parts, translations)
+        result = {"verses": [_shape(verse, translations, fields) for verse in verses]}
+        return _response(200, result, cache_control=_CACHE_STATIC)
     
     # 6. Failed
     return _response(404, {"message": f"Invalid path: {path}"})
 
 
+_CLIENT_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def dynamodb():
+    """
+    Dynamodb client. Only created (and boto3 only imported, which is slow) when first
+    needed, since lots of requests can be answered without it.
+    """
+    with _CLIENT_LOCK:  # <- creating clients isn't thread-safe
+        import boto3
+        return boto3.client("dynamodb")
+
+
 @lru_cache(maxsize=10)
 def resource(name):
     """
@@ -70,86 +144,349 @@ def resource(name):
         return json.load(f)
 
 
-@lru_cache(maxsize=100)
-def chapter(chapter_id):
+def chapter(chapter_id, start=None, end=None, translations=None, cached=True):
     """
-    Load chapter from bibles table
+    Load chapter, optionally only from verse `start` and/or up to `end` and only with some
+    translations. Comes from the bundled verse store if it's there, else the bibles table,
+    and is only cached if `cached`.
     """
-    condition = Key("chapterId").eq(chapter_id)
-    resp = bibles_table.query(KeyConditionExpression=condition)
-    return resp["Items"]
+    items = stored_chapter(chapter_id, cached)
+    if items is None:
+        query = _query_chapter if cached else _query_chapter.__wrapped__
+        return query(chapter_id, start, end, translations)
+    return [
+        item for item in items
+        if (not start or item["verseNum"] >= start) and (not end or item["verseNum"] <= end)
+    ]
 
 
-@lru_cache(maxsize=500)
+def stored_chapter(chapter_id, cached=True):
+    """
+    Load chapter from the bundled verse store (or None if it isn't in there).
+    """
+    if verse_store is None or chapter_id not in verse_store:
+        return None
+    if not cached:
+        return verse_store.chapter(chapter_id)
+    items = store_cache.get(chapter_id)
+    if items is None:
+        items = verse_store.chapter(chapter_id)
+        store_cache.put(chapter_id, items, size=verse_store.size(chapter_id))
+    return items
+
+
+@Cache("fragments", _FRAGMENT_CACHE_BYTES, _CACHE_TTL, _NEGATIVE_CACHE_TTL)
+def _chapter_fragments(chapter_id, start=None, end=None):
+    """
+    Json of each verse of (part of) a chapter, as returned by the api, ready for splicing
+    into a response.
+    """
+    # Only the fragments are cached, not the items they're made from as well
+    return [_dumps(_shape(verse)) for verse in chapter(chapter_id, start, end, cached=False)]
+
+
+@Cache("chapters", _CHAPTER_CACHE_BYTES, _CACHE_TTL, _NEGATIVE_CACHE_TTL)
+def _query_chapter(chapter_id, start=None, end=None, translations=None):
+    condition = "chapterId = :c"
+    values = {":c": {"S": chapter_id}}
+    if start and end:
+        condition += " AND verseNum BETWEEN :s AND :e"
+    elif start:
+        condition += " AND verseNum >= :s"
+    elif end:
+        condition += " AND verseNum <= :e"
+    if start:
+        values[":s"] = {"N": str(start)}
+    if end:
+        values[":e"] = {"N": str(end)}
+    kwargs = {
+        "TableName": "B3Bibles",
+        "KeyConditionExpression": condition,
+        "ExpressionAttributeValues": values,
+        **_projection(translations),
+    }
+    items = _Items()
+    while True:
+        resp = dynamodb().query(**kwargs)
+        items.extend(_from_item(item) for item in resp["Items"])
+        headers = resp.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+        items.nbytes += int(headers.get("content-length") or len(resp["Items"]) * len(_TRANSLATIONS) * _TRANSLATION_BYTES)
+        # A query returns at most 1MB, so big chapters can come in several pages
+        if "LastEvaluatedKey" not in resp:
+            return items
+        kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+
+class _Items(list):
+    """
+    Items of a query, plus the size of the responses they came in (which the cache goes by).
+    """
+    nbytes = 0
+
+
+@lru_cache(maxsize=1)
+def strongs_index():
+    """
+    Index for looking up single strongs entries.
+    """
+    return StrongsIndex(resources_dir / "strongs.b3x")
+
+
+@lru_cache(maxsize=1)
+def strongs_dump():
+    """
+    Gzipped json of all strongs entries, plus its ETag.
+    """
+    blob = (resources_dir / "strongs.json.gz").read_bytes()
+    return blob, f'"{hashlib.sha256(blob).hexdigest()[:32]}"'
+
+
+@Cache("references", _REFERENCE_CACHE_BYTES, _CACHE_TTL, _NEGATIVE_CACHE_TTL)
 def references(term):
     """
-    Load list of refs and ref counts for a term.
+    Load the posting list of a term i.e. its verses and counts (or None if it doesn't exist).
     """
-    response = search_table.get_item(Key={"term": term})
-    return json.loads(response["Item"]["refs"])
+    response = dynamodb().get_item(TableName="B3Search", Key={"term": {"S": term}})
+    if "Item" not in response:
+        return None
+    return Postings(response["Item"]["postings"]["B"], list(resource("books")))
+
+
+def _handle_strongs(parts, query):
+    # Single entry
+    if parts:
+        entry = strongs_index().get(parts[0]) if len(parts) == 1 else None
+        if entry is None:
+            return _response(404, {"message": f"Unknown strongs id '{'/'.join(parts)}'"})
+        return _response(200, entry, cache_control=_CACHE_STATIC)
 
+    # Several entries
+    if query.get("ids"):
+        ids = query["ids"].split(",")
+        if len(ids) > _MAX_STRONGS_IDS:
+            return _response(400, {"message": f"Please ask for <= {_MAX_STRONGS_IDS} ids"})
+        entries = {id_: strongs_index().get(id_) for id_ in ids}
+        entries = {id_: entry for id_, entry in entries.items() if entry is not None}
+        return _response(200, entries, cache_control=_CACHE_STATIC)
 
-def _handle_search(query):
+    # Everything, which is already gzipped
+    blob, etag = strongs_dump()
+    print(f"Status=200 Body=<{len(blob):,} bytes of gzipped json>")
+    return {
+        "statusCode": "200",
+        "body": base64.b64encode(blob).decode("ascii"),
+        "isBase64Encoded": True,
+        "headers": {**_HEADERS, "ETag": etag, "Cache-Control": _CACHE_STATIC, "Content-Encoding": "gzip"},
+    }
+
+
+def _handle_search(query, translations=None, fields=None):
     term = query["term"]
     result = {"term": term}
     # Get references
-    refs = references(term)
-    # Filter for book
+    postings = references(term)
+    if postings is None:
+        return {"error": f"Unknown term '{term}'"}
+    page = int(query.get("page", 1))
+    size = int(query.get("size", 0))
+    start, stop = ((page - 1) * size, page * size) if size else (0, None)
+    # Filter for book (or chapter) and/or collection, which are lookups in the posting list
     book = query.get("book")
     if book:
         result["book"] = book
-        refs = [ref for ref in refs if ref[0].startswith(book)]
-    result["nrefs"] = sum(count for _, count in refs)
-    result["nverses"] = len(refs)
+        postings = _in_book(postings, book)
+        if postings is None:
+            return {"error": f"Unknown book '{book}'"}
+    collection = query.get("collection")
+    if collection:
+        result["collection"] = collection
+        if collection not in _collections():
+            return {"error": f"Unknown collection '{collection}'"}
+        postings = postings.books(*_collections()[collection])
+    # Totals are in the posting list, so only the page needs decoding
+    result["nrefs"] = postings.nrefs
+    result["nverses"] = postings.nverses
+    refs = postings.refs(start, stop)
     # Do pagination
-    page = int(query.get("page", 1))
-    size = int(query.get("size", 0))
     if size:
-        refs = refs[(page - 1) * size : page * size]
         result["page"] = page
         result["pages"] = int((result["nverses"] - 0.1) // size + 1)
     result["refs"] = refs
     # Fetch verses
-    refs_only = strtobool(query.get("refsOnly", "false"))
+    refs_only = _is_true(query.get("refsOnly", "false"))
     if not refs_only:
-        if len(refs) > 100:
-            return {"error": "Please set a page `size` of <= 100"}
-        result["verses"] = _batch_get_verses(refs)
+        max_verses = _max_verses(translations, fields)
+        if len(refs) > max_verses:
+            return {"error": f"Please set a page `size` of <= {max_verses} (or ask for fewer translations or fields)"}
+        verses = _batch_get_verses(refs, translations)
+        result["verses"] = [_shape(verse, translations, fields) for verse in verses]
     return result
 
 
-def _batch_get_verses(refs):
+def _max_verses(translations=None, fields=None):
     """
-    Batch get a list of verses...this is actually fairly fast.
+    Most verses a search can return with the translations and token fields asked for, so
+    the response doesn't get too big.
+    """
+    verse_bytes = len(translations or _TRANSLATIONS) * _TRANSLATION_BYTES
+    if fields:
+        verse_bytes *= max(sum(_FIELD_SHARES[f] for f in fields), 0.25)  # <- there's overhead per token too
+    return min(_MAX_VERSES, int(_MAX_VERSES_BYTES // verse_bytes))
+
+
+def _in_book(postings, book):
+    """
+    Postings in a book (e.g. "John", which doesn't include "1John") or a chapter of one
+    (e.g. "Ps.23"), or None if there's no such book or chapter.
+    """
+    code, _, chapter = book.partition(".")
+    books = resource("books")
+    if code not in books:
+        return None
+    if not chapter:
+        return postings.books(_book_indexes()[code])
+    if not chapter.isdigit() or not 0 < int(chapter) <= books[code]["chapters"]:
+        return None
+    return postings.chapter(_book_indexes()[code], int(chapter))
+
+
+@lru_cache(maxsize=1)
+def _book_indexes():
+    return {code: i for i, code in enumerate(resource("books"))}
+
+
+@lru_cache(maxsize=1)
+def _collections():
+    """
+    Indexes of the first and last books of each collection (e.g. "Torah"), whose books
+    are all together in books.json.
+    """
+    collections = {}
+    for i, book in enumerate(resource("books").values()):
+        first, _ = collections.get(book["collection"], (i, i))
+        collections[book["collection"]] = (first, i)
+    return collections
+
+
+def _batch_get_verses(refs, translations=None):
+    """
+    Batch get a list of verses...this is actually fairly fast. Verses in the bundled verse
+    store are read from there, and the rest are fetched in chunks of 100 keys (the most
+    dynamodb allows), with the chunks fetched concurrently.
     """
     key_pairs = [ref.rsplit(".", 1) for ref, _ in refs]
     key_pairs = [(cid, int(vnum)) for cid, vnum in key_pairs]
-    keys = [{"chapterId": cid, "verseNum": vnum} for cid, vnum in key_pairs]
-    response = dynamodb.batch_get_item(
-        RequestItems={"B3Bibles": {"Keys": keys}},
-        ReturnConsumedCapacity="TOTAL",
-    )
-    verses = response["Responses"]["B3Bibles"]
+    key_to_verse = {}
+    unique = []
+    for cid, keys in itertools.groupby(dict.fromkeys(key_pairs), key=lambda k: k[0]):
+        items = stored_chapter(cid)
+        if items is None:
+            unique.extend(keys)
+        else:
+            key_to_verse.update(((v["chapterId"], v["verseNum"]), v) for v in items)
+    chunks = [unique[i:i + _BATCH_GET_SIZE] for i in range(0, len(unique), _BATCH_GET_SIZE)]
+    for verses in executor.map(lambda chunk: _batch_get_chunk(chunk, translations), chunks):
+        key_to_verse.update(((v["chapterId"], v["verseNum"]), v) for v in verses)
     # Bleaurgh, need to sort
-    key_to_verse = {(v["chapterId"], v["verseNum"]): v for v in verses}
-    return [key_to_verse[k] for k in key_pairs]
+    return [key_to_verse[k] for k in key_pairs if k in key_to_verse]
 
 
-def _fetch_verses(parts):
-    code = parts[0]
-    c1, v1 = to_cv(parts[1])
-    c2, v2 = to_cv(parts[2])
+def _batch_get_chunk(key_pairs, translations=None):
+    """
+    Get up to 100 verses, retrying any keys dynamodb didn't get round to (it'll leave some
+    unprocessed when throttled or if the response would be over 16MB).
+    """
+    request = {
+        "Keys": [{"chapterId": {"S": cid}, "verseNum": {"N": str(vnum)}} for cid, vnum in key_pairs],
+        **_projection(translations),
+    }
+    verses = []
+    for attempt in range(_BATCH_GET_ATTEMPTS):
+        response = dynamodb().batch_get_item(
+            RequestItems={"B3Bibles": request},
+            ReturnConsumedCapacity="TOTAL",
+        )
+        verses.extend(_from_item(item) for item in response["Responses"].get("B3Bibles", []))
+        request = response.get("UnprocessedKeys", {}).get("B3Bibles")
+        if not request:
+            return verses
+        time.sleep(random.uniform(0, min(1.0, 0.025 * 2 ** attempt)))  # <- "full jitter" backoff
+    raise RuntimeError(f"Failed to get {len(request['Keys'])} verses after {_BATCH_GET_ATTEMPTS} attempts")
+
+
+def _fetch_verses(parts, translations=None):
+    """
+    Fetch a range of verses, querying its chapters concurrently.
+    """
+    queries = [query + (translations,) for query in _chapter_queries(parts)]
     verses = []
-    for c in range(c1, c2 + 1):
-        items = chapter(f"{code}.{c}")
-        if c == c1:
-            items = [item for item in items if item["verseNum"] >= v1]
-        if c == c2 and v2:
-            items = [item for item in items if item["verseNum"] <= v2]
+    for items in executor.map(lambda query: chapter(*query), queries):
         verses.extend(items)
     return verses
 
 
+def _chapter_queries(parts):
+    """
+    (chapter id, start verse, end verse) of each chapter in a range.
+    """
+    code = parts[0]
+    c1, v1 = to_cv(parts[1])
+    c2, v2 = to_cv(parts[2])
+    return [
+        (f"{code}.{c}", v1 if c == c1 else None, v2 if c == c2 else None)
+        for c in range(c1, c2 + 1)
+    ]
+
+
+def _selection(query):
+    """
+    Translations and token fields asked for with e.g. `translations=KJV,WLC` and
+    `fields=text,strongs` (None meaning all of them).
+    """
+    translations = fields = None
+    if query.get("translations"):
+        requested = set(query["translations"].upper().split(","))
+        if requested - set(_TRANSLATIONS):
+            raise ValueError(f"Unknown translations: {', '.join(sorted(requested - set(_TRANSLATIONS)))}")
+        translations = tuple(t for t in _TRANSLATIONS if t in requested)
+    if query.get("fields"):
+        fields = frozenset(query["fields"].split(","))
+        if fields - _TOKEN_FIELDS:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(fields - _TOKEN_FIELDS))}")
+    return translations, fields
+
+
+def _projection(translations):
+    """
+    Projection for only reading some translations of a verse item (none means all of them).
+    """
+    if not translations:
+        return {}
+    # "translations" is the attribute of items uploaded before they were split out
+    attrs = ["chapterId", "verseNum", "translations", *translations]
+    names = {f"#a{i}": attr for i, attr in enumerate(attrs)}
+    return {"ProjectionExpression": ", ".join(names), "ExpressionAttributeNames": names}
+
+
+def _shape(verse, translations=None, fields=None):
+    """
+    Convert a verse item to what the api returns, with its translations as a list (only the
+    ones asked for) and their tokens only having the fields asked for.
+    """
+    if "translations" in verse:
+        found = {t["translation"]: t for t in verse["translations"]}
+    else:
+        found = {t: {"translation": t, **verse[t]} for t in _TRANSLATIONS if t in verse}
+    result = []
+    for t in translations or _TRANSLATIONS:
+        if t in found:
+            tokens = found[t]["tokens"]
+            if fields:
+                tokens = [{k: v for k, v in token.items() if k in fields} for token in tokens]
+            result.append({"translation": t, "lan": found[t]["lan"], "tokens": tokens})
+    return {"chapterId": verse["chapterId"], "verseNum": verse["verseNum"], "translations": result}
+
+
 def _books_by_collection(books_by_code):
     return [
         {
@@ -172,22 +509,155 @@ def to_cv(cv):
     return c, v
     
     
-def _response(code, content):
-    body = json.dumps(content, cls=DecimalEncoder)
+_HEADERS = {
+    "Access-Control-Allow-Origin" : "*",
+    "Access-Control-Allow-Credentials" : "true",
+    "Content-Type": "application/json",
+}
+
+
+def _response(code, content, cache_control=None):
+    body = content if isinstance(content, RawJSON) else _dumps(content)
     print(f"Status={code} Body={body[:100]}")
+    headers = dict(_HEADERS)
+    if cache_control and code == 200:
+        headers["Cache-Control"] = cache_control
     return {
         "statusCode": str(code),
         "body": body,
-        "headers": {
-            "Access-Control-Allow-Origin" : "*",
-            "Access-Control-Allow-Credentials" : "true",
-            "Content-Type": "application/json",
-        },
+        "headers": headers,
     }
+
+
+def _negotiate(response, request_headers):
+    """
+    Give a successful response an ETag (if it hasn't got one) and return a 304 if the
+    client already has it, otherwise compress the body with the best encoding it accepts.
+    Each encoding of a body gets its own ETag (e.g. `"<hash>-gzip"`), but they all match
+    each other in an If-None-Match.
+    """
+    if response["statusCode"] != "200":
+        return response
+    request_headers = {k.lower(): v for k, v in request_headers.items()}
+    headers = response["headers"]
+    headers["Vary"] = "Accept-Encoding"
+    if "ETag" not in headers:
+        digest = hashlib.blake2b(response["body"].encode("utf8"), digest_size=16).hexdigest()
+        headers["ETag"] = f'"{digest}"'
+    etag = headers["ETag"]
+
+    accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+    if response.get("isBase64Encoded"):
+        # Already gzipped, so only need to do something if the client can't take that
+        encoding = headers.get("Content-Encoding")
+        encoding = encoding if encoding in accepted else None
+    elif len(response["body"]) < _MIN_COMPRESS_BYTES:
+        encoding = None
+    elif brotli and "br" in accepted:
+        encoding = "br"
+    elif "gzip" in accepted:
+        encoding = "gzip"
+    else:
+        encoding = None
+    headers["ETag"] = f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+    if _etag_matches(request_headers.get("if-none-match"), etag):
+        print("Status=304")
+        headers.pop("Content-Encoding", None)
+        return {"statusCode": "304", "body": "", "headers": headers}
+
+    if response.get("isBase64Encoded"):
+        if encoding:
+            return response
+        body = gzip.decompress(base64.b64decode(response["body"])).decode("utf8")
+        del headers["Content-Encoding"]
+        return {**response, "body": body, "isBase64Encoded": False}
+    if encoding == "br":
+        blob = brotli.compress(response["body"].encode("utf8"), quality=5)
+    elif encoding == "gzip":
+        blob = gzip.compress(response["body"].encode("utf8"), compresslevel=6, mtime=0)
+    else:
+        return response
+    headers["Content-Encoding"] = encoding
+    return {**response, "body": base64.b64encode(blob).decode("ascii"), "isBase64Encoded": True}
+
+
+def _accepted_encodings(accept_encoding):
+    """
+    Encodings in an Accept-Encoding header, ignoring any with q=0.
+    """
+    accepted = set()
+    for part in accept_encoding.split(","):
+        encoding, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.replace(" ", "").startswith("q="):
+                try:
+                    q = float(param.replace(" ", "")[2:])
+                except ValueError:
+                    q = 0.0
+        if encoding and q > 0:
+            accepted.add(encoding.lower())
+    if "*" in accepted:
+        accepted |= {"gzip", "br"}
+    return accepted
+
+
+def _etag_matches(if_none_match, etag):
+    """
+    Whether an If-None-Match has an ETag of any encoding of a body (or "*").
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(_base_etag(tag) == etag for tag in tags)
+
+
+def _base_etag(tag):
+    """
+    The ETag of the unencoded body that a (maybe weak or encoded) ETag is of.
+    """
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for encoding in ["gzip", "br"]:
+        if tag.endswith(f'-{encoding}"'):
+            return tag[:-len(encoding) - 2] + '"'
+    return tag
     
     
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, decimal.Decimal):
-            return int(o)
-        return super().default(o)
+class RawJSON(str):
+    """
+    Already-encoded json, to be used as a response body as is.
+    """
+
+
+def _dumps(content):
+    if orjson:
+        return orjson.dumps(content).decode("utf8")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+
+
+def _deserialize(value):
+    """
+    Deserialize a dynamodb value, with numbers as ints rather than Decimals (so there's no
+    need for a custom json encoder). Only the types that items are made of are done here.
+    """
+    (kind, v), = value.items()
+    if kind == "S":
+        return v
+    if kind == "M":
+        return {k: _deserialize(x) for k, x in v.items()}
+    if kind == "L":
+        return [_deserialize(x) for x in v]
+    if kind == "N":
+        return int(v) if v.lstrip("-").isdigit() else float(v)
+    from boto3.dynamodb.types import TypeDeserializer
+    return TypeDeserializer().deserialize(value)
+
+
+def _from_item(item):
+    return {k: _deserialize(v) for k, v in item.items()}
+
+
+def _is_true(value):
+    return value.lower() in {"1", "y", "yes", "t", "true", "on"}
@@ -0,0 +1,159 @@
+"""
+Caches for the lambda function, which live as long as its container does.
+
+Each cache is an LRU bounded by the total size of its entries rather than their number,
+and entries expire after a time-to-live so re-uploaded data gets picked up. Results that
+are "missing" (None or empty) are cached too, with their own (shorter) time-to-live. Hits
+and misses are counted so the cache sizes can be tuned against the lambda's memory.
+"""
+from collections import OrderedDict
+import os
+import threading
+import time
+
+
+_CACHES = []
+
+
+class Cache:
+    """
+    Size-bounded LRU cache with a time-to-live. Use it to decorate a function, e.g.
+
+        @Cache("chapters", max_bytes=64 * 2**20, ttl=3600)
+        def chapter(chapter_id):
+            ...
+
+    The size of an entry is a proxy for its memory use, worked out from what's at hand
+    rather than by encoding it: the `nbytes` of values that know their own size, or the
+    length of a string (or total length of a list of them).
+    """
+
+    def __init__(self, name, max_bytes, ttl, negative_ttl=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.nbytes = 0
+        self.totals = {"hits": 0, "misses": 0, "evictions": 0}
+        self.counts = dict(self.totals)
+        self._entries = OrderedDict()  # <- key -> (value, size, expires)
+        self._lock = threading.Lock()
+        _CACHES.append(self)
+
+    def __call__(self, func):
+        def wrapper(*args):
+            value = self.get(args, _MISS)
+            if value is _MISS:
+                value = func(*args)
+                self.put(args, value)
+            return value
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func  # <- for calling it uncached
+        wrapper.cache = self
+        return wrapper
+
+    def get(self, key, default=None):
+        """
+        Get an unexpired value (counting the hit or miss), or the default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[2] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._count("misses")
+                return default
+            self._entries.move_to_end(key)
+            self._count("hits")
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """
+        Cache a value, evicting the least recently used entries to make room for it. Its
+        size is worked out if not given.
+        """
+        size = _sizeof(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        ttl = self.negative_ttl if value is None or value == [] else self.ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self.nbytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._count("evictions")
+            self._entries[key] = (value, size, time.monotonic() + ttl)
+            self.nbytes += size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """
+        Counts since the last call (and in total), plus the current size.
+        """
+        with self._lock:
+            counts, self.counts = self.counts, dict.fromkeys(self.counts, 0)
+            return {
+                **counts,
+                "total": dict(self.totals),
+                "entries": len(self._entries),
+                "nbytes": self.nbytes,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.nbytes -= size
+
+    def _count(self, name):
+        self.counts[name] += 1
+        self.totals[name] += 1
+
+
+def log_stats():
+    """
+    Print the hit/miss counts of every cache since they were last printed.
+    """
+    for cache in _CACHES:
+        s = cache.stats()
+        total = s["total"]
+        print(
+            f"Cache {cache.name}: hits={s['hits']} misses={s['misses']} evictions={s['evictions']} "
+            f"entries={s['entries']} size={s['nbytes'] / 2**20:.1f}MB/{cache.max_bytes / 2**20:.0f}MB "
+            f"hit-rate={total['hits'] / max(total['hits'] + total['misses'], 1):.0%} (lifetime)"
+        )
+
+
+def env_mb(name, default):
+    """
+    Size in bytes from an environment variable in MB.
+    """
+    return int(float(os.environ.get(name, default)) * 2**20)
+
+
+def env_seconds(name, default):
+    """
+    Time in seconds from an environment variable.
+    """
+    return float(os.environ.get(name, default))
+
+
+_MISS = object()
+
+
+def _sizeof(value):
+    nbytes = getattr(value, "nbytes", None)
+    if nbytes is not None:
+        return nbytes
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_sizeof(v) for v in value)
+    raise TypeError(f"Can't size a {type(value).__name__}, so give its size to `put`")
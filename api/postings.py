@@ -0,0 +1,144 @@
+"""
+Decoder for the posting lists of the B3Search table (see `b3/postings.py` for the format).
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+import copy
+from itertools import islice
+import sys
+
+
+VERSION = 2
+
+
+class Postings:
+    """
+    Posting list of a term: the verses it's in (in canonical order) and how many times.
+    The chapter directory is loaded up front, so the totals of (and the way to) any run of
+    books or chapters are a lookup away, but postings are only decoded as they're asked for.
+    """
+
+    def __init__(self, blob, codes):
+        self._blob = blob
+        self._codes = codes  # <- book codes in the order of books.json
+        version, pos = _varint(blob, 0)
+        if version != VERSION:
+            raise ValueError(f"Posting list is version {version} but expected {VERSION}")
+        nchapters, pos = _varint(blob, pos)
+        # Chapter keys, plus the verses, refs and bytes before each chapter (and after the last)
+        self._keys, pos = _array("H", blob, pos, nchapters)
+        self._verses, pos = _array("I", blob, pos, nchapters + 1)
+        self._refs, pos = _array("I", blob, pos, nchapters + 1)
+        self._offsets, self._start = _array("I", blob, pos, nchapters + 1)  # <- segments start after
+        self._lo, self._hi = 0, nchapters  # <- the chapters in view
+        self.nbytes = len(blob) * 2  # <- the directory is copied into arrays
+
+    @property
+    def nverses(self):
+        return self._verses[self._hi] - self._verses[self._lo]
+
+    @property
+    def nrefs(self):
+        return self._refs[self._hi] - self._refs[self._lo]
+
+    def books(self, first, last=None):
+        """
+        View of the postings in a run of books, by their index in books.json.
+        """
+        last = first if last is None else last
+        return self._within(first << 8, last << 8 | 0xFF)
+
+    def chapter(self, book, chapter):
+        """
+        View of the postings in a single chapter of a book (by its index in books.json).
+        """
+        return self._within(book << 8 | chapter, book << 8 | chapter)
+
+    def __iter__(self):
+        """
+        Iterate over (verse id, count) pairs.
+        """
+        return self._iter(self._lo, 0)
+
+    def refs(self, start=0, stop=None):
+        """
+        Slice of the list as [verse ref, count] pairs, e.g. ["Gen.1.1", 1]. Skips straight
+        to the chapter the slice starts in.
+        """
+        start = max(start, 0)
+        position = self._verses[self._lo] + start
+        if position >= self._verses[self._hi]:
+            return []
+        i = bisect_right(self._verses, position, self._lo, self._hi) - 1
+        postings = self._iter(i, position - self._verses[i])
+        if stop is not None:
+            postings = islice(postings, max(stop - start, 0))
+        return [[self.ref(vid), count] for vid, count in postings]
+
+    def ref(self, vid):
+        return f"{self._codes[vid >> 16]}.{vid >> 8 & 0xFF}.{vid & 0xFF}"
+
+    def _within(self, first, last):
+        """
+        View of the postings in the chapters with keys from `first` to `last`.
+        """
+        view = copy.copy(self)
+        view._lo = bisect_left(self._keys, first, self._lo, self._hi)
+        view._hi = bisect_right(self._keys, last, view._lo, self._hi)
+        return view
+
+    def _iter(self, i, skip):
+        """
+        Iterate over (verse id, count) pairs from chapter `i`, skipping `skip` of its postings.
+        """
+        blob, start = self._blob, self._start
+        for j in range(i, self._hi):
+            base = self._keys[j] << 8
+            pos, end = start + self._offsets[j], start + self._offsets[j + 1]
+            verse_num = -1
+            while pos < end:
+                byte = blob[pos]
+                pos += 1
+                n = byte & 0x7F
+                shift = 7
+                while byte & 0x80:
+                    byte = blob[pos]
+                    pos += 1
+                    n |= (byte & 0x7F) << shift
+                    shift += 7
+                verse_num += n >> 1
+                if n & 1:
+                    count, pos = _varint(blob, pos)
+                else:
+                    count = 1
+                if skip:
+                    skip -= 1
+                    continue
+                yield base | verse_num, count
+
+
+def _array(typecode, blob, pos, n):
+    """
+    Read an array of `n` little-endian numbers at a position, returning it and the position
+    after it.
+    """
+    values = array(typecode)
+    end = pos + n * values.itemsize
+    values.frombytes(blob[pos:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values, end
+
+
+def _varint(blob, pos):
+    """
+    Decode the varint at a position, returning it and the position after it.
+    """
+    n = shift = 0
+    while True:
+        byte = blob[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
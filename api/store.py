@@ -0,0 +1,93 @@
+"""
+Readers for the indexed files that `python b3 build-api` bundles with the lambda (see
+`b3/store.py` for the format).
+"""
+import json
+import mmap
+import struct
+import zlib
+
+
+VERSION = 2
+
+
+class IndexedFile:
+    """
+    Memory-mapped file of blocks, plus an index of where each one is.
+    """
+
+    magic = None
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:4] != self.magic:
+            raise ValueError(f"{path} is not a {type(self).__name__}")
+        (header_len,) = struct.unpack_from("<I", self._mmap, len(self._mmap) - 4)
+        header = json.loads(self._mmap[len(self._mmap) - 4 - header_len:-4])
+        if header["version"] != VERSION:
+            raise ValueError(f"{path} is version {header['version']} but expected {VERSION}")
+        self._index = header["index"]
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def block(self, key):
+        """
+        Raw bytes of a block, or None if it isn't in the file.
+        """
+        if key not in self._index:
+            return None
+        offset, length = self._index[key][:2]
+        return self._mmap[offset:offset + length]
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+
+class VerseStore(IndexedFile):
+    """
+    Verse store, decompressing a chapter at a time.
+    """
+
+    magic = b"B3V1"
+
+    def chapter(self, chapter_id):
+        """
+        Verse items of a chapter, or None if it isn't in the store.
+        """
+        block = self.block(chapter_id)
+        return None if block is None else json.loads(zlib.decompress(block))
+
+    def size(self, chapter_id):
+        """
+        Uncompressed size of a chapter in bytes.
+        """
+        return self._index[chapter_id][2]
+
+
+class StrongsIndex(IndexedFile):
+    """
+    Strongs entries by id, e.g. "H1" or "G2".
+    """
+
+    magic = b"B3X1"
+
+    def get(self, id_):
+        """
+        A strongs entry, or None if there isn't one.
+        """
+        block = self.block(id_)
+        return None if block is None else json.loads(block)
+
+
+def open_store(path):
+    """
+    Open a verse store, or return None if there isn't one.
+    """
+    return VerseStore(path) if path.exists() else None
@@ -1,4 +1,6 @@
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import itertools
 import json
 import logging
 from pathlib import Path
@@ -7,19 +9,33 @@ import sys
 import click
 import dotenv
 
+from b3 import bibles, ledger, lxx, manifest, postings, staging, store, strongs
 from b3.books import get_books
 from b3.build import build_api
 from b3.db import upload
-from b3.ebible import fetch_translation_from_ebible
-from b3.lxx import create_lxx
-from b3.openscriptures import fetch_translation_from_openscriptures
-from b3.strongs import fetch_strongs_from_openscriptures, get_references
-from b3.utils import get_cache_path
+from b3.ebible import download_translation, fetch_translation_from_ebible
+from b3.lxx import create_lxx_book, download_lxx
+from b3.openscriptures import download_grtisch, download_hewlc, fetch_hewlc_book, fetch_translation_from_openscriptures
+from b3.parser import osis, usfx
+from b3.strongs import download_strongs, fetch_strongs_from_openscriptures, get_postings
+from b3.translit import greek, hebrew
+from b3.utils import parallel_map
 
 
 fmt = "%(asctime)s : %(levelname)s : %(message)s"
 logging.basicConfig(stream=sys.stdout, level=logging.INFO, format=fmt)
 
+# Translations that can only be staged once others have been
+_STAGING_DEPENDENCIES = {"grlxx": {"hewlc"}}
+
+# Versions of the code that each staged artifact is built with
+_STAGING_VERSIONS = {
+    "ebible": {"usfx": usfx.VERSION, "staging": staging.VERSION},
+    "hewlc": {"osis": osis.VERSION, "hebrew": hebrew.VERSION, "staging": staging.VERSION},
+    "grtisch": {"osis": osis.VERSION, "greek": greek.VERSION, "staging": staging.VERSION},
+    "grlxx": {"lxx": lxx.VERSION, "greek": greek.VERSION, "staging": staging.VERSION},
+}
+
 
 @click.group()
 def cli():
@@ -27,102 +43,234 @@ def cli():
 
 @cli.command("stage")
 @click.argument("translations")
-def stage(translations):
+@click.option("--jobs", default=1, show_default=True, help="Number of worker processes to stage with.")
+@click.option("--force", is_flag=True, help="Restage even if nothing has changed.")
+@click.option("--refresh", is_flag=True, help="Ask the servers whether cached downloads have changed.")
+def stage(translations, jobs, force, refresh):
     """Parse USFX file from ebibles.com."""
-    translations = translations.lower().split(",")
-    for tr in translations:
-        logging.info(f"STAGING {tr.upper()}")
-        if tr in {"hewlc", "grtisch"}:
-            records = fetch_translation_from_openscriptures(tr)
-        elif tr in {"grlxx"}:
-            records = create_lxx()
-        else:
-            records = fetch_translation_from_ebible(tr)
-        _save_to_staging(records, tr)
+    translations = _with_dependents(translations.lower().split(","))
+    if jobs <= 1:
+        for tr in translations:
+            _stage_translation(tr, force=force, refresh=refresh)
+        logging.info(f"Done")
+        return
+
+    # Independent translations are staged side-by-side, sharing a pool of worker
+    # processes that also takes the per-book work of hewlc and grlxx
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for wave in _staging_waves(translations):
+            with ThreadPoolExecutor(max_workers=len(wave)) as threads:
+                list(threads.map(lambda tr: _stage_translation(tr, executor, force, refresh), wave))
     logging.info(f"Done")
 
 
 @cli.command("upload-bibles")
 @click.option("--filt", default="Gen.1,Gen.2,Ps.1,Matt.1,Matt.2", help="Limit number of records uploaded to dynamodb.")
-def run_upload_bibles(filt):
+@click.option("--dry-run", is_flag=True, help="Only report what would be uploaded.")
+@click.option("--full", is_flag=True, help="Upload everything, even if unchanged since the last upload.")
+@click.option("--workers", default=4, show_default=True, help="Number of threads writing to dynamodb.")
+@click.option("--max-wcu", type=int, help="Limit the write capacity units consumed per second.")
+def run_upload_bibles(filt, dry_run, full, workers, max_wcu):
     """Upload staged results to dynamodb."""
     dotenv.load_dotenv()
-    records = {}
-    for version in ["enasv", "enkjv", "enweb", "enwmb", "hewlc", "grlxx", "grtisch"]:
-
-        logging.info(f"Loading {version.upper()} from staging")
-        path = get_cache_path("staging", f"{version}.json")
-        if not path.exists():
-            logging.warning(f"Ignoring {version} since {path} does not exist.")
-            continue
-
-        with path.open(encoding="utf8") as f:
-            for r in json.load(f):
-                key = r["chapterId"], r["verseNum"]
-                if key not in records:
-                    records[key] = {
-                        "chapterId": r["chapterId"],
-                        "verseNum": r["verseNum"],
-                        "translations": [],
-                    }
-                records[key][f"translations"].append({
-                    "translation": version[2:].upper(),
-                    "lan": version[:2],
-                    "tokens": r["tokens"],
-                })
-    records = list(records.values())
-    
-    logging.info(f"Uploading {len(records):,} records to dynamodb")
-    if filt.lower() != "all":
+    in_scope = bibles.scope(filt)
+    if in_scope is not None:
         logging.warning(f'Limiting to "{filt}" for upload')
-        filt = set(filt.split(","))
-        records = [r for r in records if r["chapterId"] in filt or r["chapterId"].split(".")[0] in filt]
-    upload(records, table="B3Bibles")
+    records = bibles.iter_verses(in_scope=in_scope)
+    _upload_changes(records, "B3Bibles", dry_run, full, in_scope, workers=workers, max_wcu=max_wcu)
     logging.info(f"Done")
 
 
+@cli.command("export-staging")
+@click.argument("translations")
+def run_export_staging(translations):
+    """
+    Export staged translations to json for debugging.
+    """
+    for tr in translations.lower().split(","):
+        path = staging.export_json(tr)
+        logging.info(f"Exported {tr.upper()} to {path}")
+
+
 @cli.command("upload-search")
-def run_upload_search():
+@click.option("--dry-run", is_flag=True, help="Only report what would be uploaded.")
+@click.option("--full", is_flag=True, help="Upload everything, even if unchanged since the last upload.")
+@click.option("--workers", default=4, show_default=True, help="Number of threads writing to dynamodb.")
+@click.option("--max-wcu", type=int, help="Limit the write capacity units consumed per second.")
+def run_upload_search(dry_run, full, workers, max_wcu):
     """
     Upload staged results to dynamodb.
     """
     records = []
     for lan in ["hebrew", "greek"]:
         logging.info(f"Finding strongs search terms for {lan}")
-        refs = get_references(lan)
-        records.extend({"term": sid, "refs": json.dumps(rlist)} for sid, rlist in refs.items())
-    upload(records, table="B3Search")
+        index = get_postings(lan)
+        records.extend({"term": sid, "postings": postings.encode(plist)} for sid, plist in index.items())
+    _upload_changes(records, "B3Search", dry_run, full, workers=workers, max_wcu=max_wcu)
     logging.info(f"Done")
 
   
 @cli.command("build-api")
 @click.option("--api-only", is_flag=True)
-def run_build_api(api_only):
+@click.option("--force", is_flag=True, help="Rebuild resources even if nothing has changed.")
+@click.option("--with-verses", is_flag=True, help="Bundle a verse store so the api can serve chapters without dynamodb.")
+@click.option("--refresh", is_flag=True, help="Ask the servers whether cached downloads have changed.")
+def run_build_api(api_only, force, with_verses, refresh):
     """
     Package lambda api.
     """
     if not api_only:
-        logging.info("Creating api/resources/strongs.json")
-        record = fetch_strongs_from_openscriptures()
         resources_dir = Path(__file__).parent.parent / "api" / "resources"
         resources_dir.mkdir(exist_ok=True)
-        with (resources_dir / "strongs.json").open("w", encoding="utf8") as f:
-            json.dump(record, f)
+        path = resources_dir / "strongs.json"
+        versions = {"strongs": strongs.VERSION, "hebrew": hebrew.VERSION, "greek": greek.VERSION}
+        inputs = manifest.fingerprint(sources=download_strongs(refresh), versions=versions, depends=["hewlc", "grtisch"])
+        derived = [resources_dir / "strongs.json.gz", resources_dir / "strongs.b3x"]
+        if force or not manifest.is_fresh("strongs", inputs, path) or not all(p.exists() for p in derived):
+            logging.info("Creating api/resources/strongs.json")
+            strongs.save_strongs(fetch_strongs_from_openscriptures(), resources_dir)
+            manifest.record("strongs", inputs, path)
+        else:
+            logging.info("api/resources/strongs.json is up to date")
 
         logging.info("Creating api/resources/books.json")
         books = get_books()
         with (resources_dir / "books.json").open("w", encoding="utf8") as f:
-            json.dump(books, f)
+            json.dump(books, f, separators=(",", ":"))
+
+        if with_verses:
+            path = resources_dir / "verses.b3v"
+            inputs = manifest.fingerprint(versions={"store": store.VERSION}, depends=bibles.TRANSLATIONS)
+            if force or not manifest.is_fresh("verses", inputs, path):
+                logging.info("Creating api/resources/verses.b3v")
+                store.write(path)
+                manifest.record("verses", inputs, path)
+            else:
+                logging.info("api/resources/verses.b3v is up to date")
 
     logging.info("Building build/api.zip")
-    build_api()
+    build_api(with_verses=with_verses)
+
+
+def _upload_changes(records, table, dry_run=False, full=False, in_scope=None, workers=4, max_wcu=None):
+    """
+    Only upload records that are new or have changed since the last upload (and delete
+    items that no longer exist), keeping track of what's been uploaded in a local ledger.
+
+    The ledger is checkpointed as batches get written, so rerunning an interrupted upload
+    carries on from where it stopped.
+    """
+    previous = ledger.load(table)
+    plan = ledger.plan(records, table, previous, in_scope=in_scope, full=full)
+    if dry_run:
+        for _ in itertools.chain(plan["puts"], plan["deletes"]):
+            pass
+        ledger.log_plan(table, plan)
+        return
+    checkpoint = ledger.Checkpoint(table, previous, plan["digests"])
+    try:
+        upload(
+            plan["puts"], table=table, deletes=plan["deletes"],
+            workers=workers, max_wcu=max_wcu, on_written=checkpoint,
+        )
+    finally:
+        checkpoint.save()
+    ledger.log_plan(table, plan)
+
+
+def _stage_translation(tr, executor=None, force=False, refresh=False):
+    logging.info(f"STAGING {tr.upper()}")
+    if tr == "hewlc":
+        _stage_books(tr, download_hewlc(refresh), fetch_hewlc_book, executor, force)
+        return
+    if tr == "grlxx":
+        _stage_books(tr, download_lxx(refresh), create_lxx_book, executor, force, depends_on="hewlc")
+        return
+
+    if tr == "grtisch":
+        source, versions = download_grtisch(refresh), _STAGING_VERSIONS["grtisch"]
+        fetch = fetch_translation_from_openscriptures
+    else:
+        source, versions = download_translation(tr, refresh), _STAGING_VERSIONS["ebible"]
+        fetch = fetch_translation_from_ebible
+    inputs = manifest.fingerprint(sources=[source], versions=versions)
+    if not force and manifest.is_fresh(tr, inputs, staging.staging_path(tr)):
+        logging.info(f"{tr.upper()} is up to date")
+        return
+    records = _run(executor, fetch, tr)
+    _save_to_staging(records, tr)
+    manifest.record(tr, inputs, staging.staging_path(tr))
+
+
+def _stage_books(tr, paths, fetch_book, executor=None, force=False, depends_on=None):
+    """
+    Stage a translation book by book, only redoing books whose inputs have changed, and
+    then stitch the books together in canonical order.
+    """
+    inputs = {
+        book_id: manifest.fingerprint(
+            sources=[path],
+            versions=_STAGING_VERSIONS[tr],
+            depends=[f"{depends_on}/{book_id}"] if depends_on else [],
+        )
+        for book_id, path in paths.items()
+    }
+    stale = [
+        book_id for book_id in paths
+        if force or not manifest.is_fresh(f"{tr}/{book_id}", inputs[book_id], staging.part_path(tr, book_id))
+    ]
+    logging.info(f"{len(stale)} of {len(paths)} books of {tr.upper()} need staging")
+    for book_id, records in zip(stale, parallel_map(fetch_book, stale, executor)):
+        path = staging.part_path(tr, book_id)
+        staging.write(records, path)
+        manifest.record(f"{tr}/{book_id}", inputs[book_id], path)
+
+    path = staging.staging_path(tr)
+    merged_inputs = manifest.fingerprint(depends=[f"{tr}/{book_id}" for book_id in paths])
+    if stale or force or not manifest.is_fresh(tr, merged_inputs, path):
+        count = staging.write(_iter_parts(tr, paths), path)
+        logging.info(f"Saved {count} to {path}")
+        manifest.record(tr, merged_inputs, path)
+    else:
+        logging.info(f"{tr.upper()} is up to date")
+
+
+def _iter_parts(tr, part_ids):
+    for part_id in part_ids:
+        with staging.StagingFile(staging.part_path(tr, part_id)) as part:
+            yield from part
+
+
+def _with_dependents(translations):
+    """
+    Add in any previously staged translations that depend on these, so they get checked too.
+    """
+    for tr, deps in _STAGING_DEPENDENCIES.items():
+        if tr not in translations and deps & set(translations) and manifest.is_recorded(tr):
+            logging.info(f"Also checking {tr.upper()} since it depends on {', '.join(sorted(deps)).upper()}")
+            translations.append(tr)
+    return translations
+
+
+def _staging_waves(translations):
+    """Split translations into waves that only depend on previous waves."""
+    remaining = list(translations)
+    while remaining:
+        wave = [tr for tr in remaining if not _STAGING_DEPENDENCIES.get(tr, set()) & set(remaining)]
+        yield wave
+        remaining = [tr for tr in remaining if tr not in wave]
+
+
+def _run(executor, func, *args):
+    """Run a function in a worker process (if there's an executor) and wait for it."""
+    if executor is None:
+        return func(*args)
+    return executor.submit(func, *args).result()
 
 
 def _save_to_staging(records, version):
-    path = get_cache_path("staging", f"{version}.json")
-    logging.info(f"Saving {len(records)} to {path}")
-    with path.open("w", encoding="utf8") as f:
-        json.dump(records, f)
+    logging.info(f"Saving {len(records)} to {staging.staging_path(version)}")
+    staging.save(records, version)
 
 
 cli()  # pylint: disable=no-value-for-parameter
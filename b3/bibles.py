@@ -0,0 +1,89 @@
+"""
+Combine the staged translations into the verse items of the B3Bibles table.
+"""
+import logging
+
+from functools import lru_cache
+
+from . import staging
+from .books import get_books
+
+
+TRANSLATIONS = ["enasv", "enkjv", "enweb", "enwmb", "hewlc", "grlxx", "grtisch"]
+
+
+def iter_verses(translations=TRANSLATIONS, in_scope=None):
+    """
+    Yield combined verse items one at a time in canonical order (by book, chapter and then
+    verse), each with the verse in every translation that has it:
+
+    - chapterId: the OSIS ID for a chapter
+    - verseNum: verse number
+    - ASV, KJV, WLC etc: lan and tokens of each translation
+
+    Translations are separate attributes so the api can read just the ones it needs.
+
+    Chapters are read one at a time, and only those passing `in_scope(chapter_id)`.
+    """
+    staged = {}
+    try:
+        for version in translations:
+            if not staging.exists(version):
+                logging.warning(f"Ignoring {version} since {staging.staging_path(version)} does not exist.")
+                continue
+            staged[version] = staging.load(version)
+
+        chapter_ids = {cid for translation in staged.values() for cid in translation.chapters()}
+        for cid in sorted(chapter_ids, key=chapter_order):
+            if in_scope is None or in_scope(cid):
+                yield from _merge_chapter(cid, staged)
+    finally:
+        for translation in staged.values():
+            translation.close()
+
+
+def scope(filt):
+    """
+    Predicate for whether a chapter (or verse in it) is within a filter like "Gen.1,Ps.1,Matt",
+    or None if the filter is "all".
+    """
+    if filt.lower() == "all":
+        return None
+    filt = set(filt.split(","))
+    return lambda chapter_id, verse_num=None: chapter_id in filt or chapter_id.split(".")[0] in filt
+
+
+def chapter_order(chapter_id):
+    """
+    Sort key putting chapters in canonical order, with unknown books at the end.
+    """
+    book, _, chapter = chapter_id.rpartition(".")
+    index = _book_index().get(book)
+    return (index is None, index or 0, book, int(chapter) if chapter.isdigit() else 0, chapter)
+
+
+def _merge_chapter(chapter_id, staged):
+    verses = {}
+    for version, translation in staged.items():
+        for verse in translation.chapter(chapter_id):
+            item = verses.setdefault(verse["verseNum"], {
+                "chapterId": chapter_id,
+                "verseNum": verse["verseNum"],
+            })
+            key = version[2:].upper()
+            if key in item:
+                # e.g. a verse split in two by a versification note, so keep both halves
+                logging.warning(f"{version.upper()} has {chapter_id}.{verse['verseNum']} more than once, so joining them")
+                item[key]["tokens"] = item[key]["tokens"] + verse["tokens"]
+                continue
+            item[key] = {
+                "lan": version[:2],
+                "tokens": verse["tokens"],
+            }
+    for verse_num in sorted(verses):
+        yield verses[verse_num]
+
+
+@lru_cache(maxsize=1)
+def _book_index():
+    return {code: i for i, code in enumerate(get_books())}
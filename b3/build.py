@@ -3,14 +3,30 @@ import zipfile
 from pathlib import Path
 
 
-def build_api():
+# Files in the lambda package, and whether they're already compressed
+_API_FILES = [
+  ("api.py", False),
+  ("cache.py", False),
+  ("postings.py", False),
+  ("store.py", False),
+  ("resources/books.json", False),
+  ("resources/strongs.json.gz", True),
+  ("resources/strongs.b3x", False),
+]
+
+
+def build_api(with_verses=False):
   """
-  Build and zip lambda code.
+  Build and zip lambda code, optionally with the verse store. Only what the lambda needs goes
+  in, deflated unless it's already compressed.
   """
   root = Path(__file__).parent.parent
   builddir = root / "build"
   builddir.mkdir(exist_ok=True)
+  files = _API_FILES + ([("resources/verses.b3v", True)] if with_verses else [])
   with zipfile.ZipFile(builddir / "api.zip", "w") as z:
-    z.write(root / "api" / "api.py", "api.py")
-    z.write(root / "api" / "resources" / "strongs.json", "resources/strongs.json")
-    z.write(root / "api" / "resources" / "books.json", "resources/books.json")
+    for name, compressed in files:
+      if compressed:
+        z.write(root / "api" / name, name, compress_type=zipfile.ZIP_STORED)
+      else:
+        z.write(root / "api" / name, name, compress_type=zipfile.ZIP_DEFLATED, compresslevel=9)
@@ -1,16 +1,196 @@
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import json
 import logging
+import math
+import random
+import threading
+import time
 
 import boto3
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
 
 
-def upload(records, table):
+_BATCH_SIZE = 25  # <- most dynamodb will take in one batch_write_item
+_MAX_ATTEMPTS = 10
+_THROTTLING_ERRORS = {"ProvisionedThroughputExceededException", "ThrottlingException", "RequestLimitExceeded"}
+_PROGRESS_EVERY = 10  # seconds
+
+
+def upload(records, table, deletes=(), workers=4, max_wcu=None, on_written=None):
+    """
+    Upload records to dynamodb, and delete any items with the given keys.
+
+    Batches are written by `workers` threads, each with its own client, and throttled to
+    roughly `max_wcu` write capacity units per second (if given). When dynamodb says the
+    table's throughput has been exceeded, the batch is retried with backoff and the rate is
+    cut. After each batch is written `on_written(requests)` is called with its list of
+    ("put", item) and ("delete", key) requests, e.g. to checkpoint progress.
+    """
+    requests = itertools.chain(
+        (("put", record) for record in records),
+        (("delete", key) for key in deletes),
+    )
+    logging.info(f"Uploading to {table} with {workers} workers" + (f" at <= {max_wcu} WCU/s" if max_wcu else ""))
+    writer = _BulkWriter(table, workers, max_wcu, on_written)
+    stats = writer.run(requests)
+    logging.info(
+        f"Upload complete: {stats['items']:,} items in {stats['batches']:,} batches over {stats['seconds']:.1f}s "
+        f"({stats['items'] / max(stats['seconds'], 1e-9):,.0f} items/s), consumed {stats['wcu']:,.0f} WCU "
+        f"({stats['wcu'] / max(stats['seconds'], 1e-9):,.0f} WCU/s) with {stats['throttles']:,} throttles "
+        f"and {stats['retries']:,} retries"
+    )
+    return stats
+
+
+class _BulkWriter:
+    """
+    Writes batches of requests to a table across several threads.
+    """
+
+    def __init__(self, table, workers, max_wcu, on_written):
+        self.table = table
+        self.workers = workers
+        self.on_written = on_written
+        self.bucket = _TokenBucket(max_wcu)
+        self.serializer = TypeSerializer()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.stats = {"items": 0, "batches": 0, "wcu": 0.0, "throttles": 0, "retries": 0, "seconds": 0.0}
+        self.started = self.last_progress = time.monotonic()
+
+    def run(self, requests):
+        # Only keep a few batches in flight, so `requests` can be a stream
+        slots = threading.BoundedSemaphore(self.workers * 2)
+        futures = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for batch in _chunks(requests, _BATCH_SIZE):
+                slots.acquire()
+                future = executor.submit(self._write, batch)
+                future.add_done_callback(lambda _: slots.release())
+                futures.append(future)
+                for done in [f for f in futures if f.done()]:
+                    done.result()  # <- raise any errors straight away
+                    futures.remove(done)
+            for future in futures:
+                future.result()
+        self.stats["seconds"] = time.monotonic() - self.started
+        return self.stats
+
+    def _write(self, batch):
+        pending = [self._to_request(kind, item) for kind, item in batch]
+        if self.bucket.max_rate:  # <- the estimate means encoding every item, so only if need be
+            self.bucket.acquire(sum(_estimate_wcu(kind, item) for kind, item in batch))
+        for attempt in range(_MAX_ATTEMPTS):
+            try:
+                response = self._client().batch_write_item(
+                    RequestItems={self.table: pending},
+                    ReturnConsumedCapacity="TOTAL",
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in _THROTTLING_ERRORS:
+                    raise
+                self.bucket.throttled()
+                self._count(throttles=1, retries=1)
+                _backoff(attempt)
+                continue
+            wcu = sum(c.get("CapacityUnits", 0) for c in response.get("ConsumedCapacity", []))
+            pending = response.get("UnprocessedItems", {}).get(self.table, [])
+            self._count(wcu=wcu)
+            if not pending:
+                break
+            # Unprocessed items are dynamodb's other way of saying slow down
+            self.bucket.throttled()
+            self._count(retries=1)
+            _backoff(attempt)
+        else:
+            raise RuntimeError(f"Gave up writing {len(pending)} items to {self.table} after {_MAX_ATTEMPTS} attempts")
+
+        self.bucket.succeeded()
+        if self.on_written:
+            self.on_written(batch)
+        self._count(items=len(batch), batches=1)
+
+    def _to_request(self, kind, item):
+        item = {k: self.serializer.serialize(v) for k, v in item.items()}
+        if kind == "put":
+            return {"PutRequest": {"Item": item}}
+        return {"DeleteRequest": {"Key": item}}
+
+    def _client(self):
+        if not hasattr(self.local, "client"):
+            self.local.client = boto3.session.Session().client("dynamodb")
+        return self.local.client
+
+    def _count(self, **counts):
+        with self.lock:
+            for k, v in counts.items():
+                self.stats[k] += v
+            now = time.monotonic()
+            if now - self.last_progress >= _PROGRESS_EVERY:
+                self.last_progress = now
+                elapsed = now - self.started
+                logging.info(
+                    f"...{self.stats['items']:,} items written in {elapsed:.0f}s "
+                    f"({self.stats['items'] / elapsed:,.0f} items/s, {self.stats['wcu'] / elapsed:,.0f} WCU/s)"
+                )
+
+
+class _TokenBucket:
     """
-    Upload records to dynamodb.
+    Token bucket rate limiter that backs off multiplicatively when throttled and recovers
+    gradually, up to the target rate. Does nothing if there's no target rate.
     """
-    logging.info(f"Uploading {len(records):,} records to {table}")
-    dynamodb = boto3.resource("dynamodb")
-    table = dynamodb.Table(table)
-    with table.batch_writer() as batch:
-        for record in records:
-            batch.put_item(Item=record)
-    logging.info("Upload complete")
+
+    def __init__(self, rate):
+        self.max_rate = rate
+        self.rate = rate
+        self.tokens = rate or 0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, n):
+        if not self.max_rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # A batch bigger than the bucket can go once the bucket is full
+                if self.tokens >= min(n, self.rate):
+                    self.tokens -= n
+                    return
+                wait = (min(n, self.rate) - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self):
+        if self.max_rate:
+            with self.lock:
+                self.rate = max(self.max_rate * 0.05, self.rate * 0.5)
+
+    def succeeded(self):
+        if self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate * 1.05)
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _estimate_wcu(kind, item):
+    """
+    One WCU per started KB of item (deletes cost one).
+    """
+    if kind == "delete":
+        return 1
+    blob = json.dumps(item, ensure_ascii=False, default=lambda value: "." * len(value))  # <- binary attributes
+    return math.ceil(len(blob.encode("utf8")) / 1024)
+
+
+def _backoff(attempt):
+    time.sleep(min(20.0, 0.05 * 2 ** attempt) * random.uniform(0.5, 1.5))
@@ -1,4 +1,6 @@
 import logging
+import os
+import shutil
 import zipfile
 
 from .parser.usfx import parse_usfx
@@ -32,24 +34,33 @@ def fetch_translation_from_ebible(translation):
     """
     Fetch and parse USFX xml-files from ebible.org.
     """
-    translation = translation.lower()
-    filename = _TRANSLATION_FILE_MAP[translation] + "_usfx"
-    logging.info(f"Downloading {filename}.xml")
-    path = _download_file(translation, filename)
+    path = download_translation(translation)
     records = parse_usfx(path)
     logging.info(f"Parsed {len(records)} verses")
     return records
 
 
-def _download_file(translation, filename):
+def download_translation(translation, revalidate=False):
+    """
+    Download (if need be) the USFX xml-file of a translation, returning its path.
+    """
+    translation = translation.lower()
+    filename = _TRANSLATION_FILE_MAP[translation] + "_usfx"
+    logging.info(f"Downloading {filename}.xml")
+    return _download_file(translation, filename, revalidate)
+
+
+def _download_file(translation, filename, revalidate=False):
     zipurl = f"{_ROOT_URL}/{filename}.zip"
     zippath = get_cache_path("raw", translation, f"{filename}.zip")
     xmlpath = get_cache_path("raw", translation, f"{filename}.xml")
 
-    download(zipurl, zippath)
-    if not xmlpath.exists():
+    fetched = download(zipurl, zippath, revalidate=revalidate)
+    if fetched or not xmlpath.exists():
         logging.info(f"Unpacking {xmlpath.name}")
+        tmppath = xmlpath.with_name(f".{xmlpath.name}.part")
         with zipfile.ZipFile(zippath) as z:
-            with z.open(xmlpath.name) as xf, xmlpath.open("wb") as f:
-                f.write(xf.read())
+            with z.open(xmlpath.name) as xf, tmppath.open("wb") as f:
+                shutil.copyfileobj(xf, f)
+        os.replace(tmppath, xmlpath)
     return xmlpath
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Ledger of what was last uploaded to each dynamodb table, so uploads only send what changed.
+
+For each table it maps the (json-encoded) primary key of every uploaded item to a digest
+of the item's contents.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from .utils import get_cache_path, write_json_atomic
+
+
+KEYS = {
+    "B3Bibles": ("chapterId", "verseNum"),
+    "B3Search": ("term",),
+}
+
+
+def load(table):
+    """
+    Load the ledger of a table (empty if nothing has been uploaded yet).
+    """
+    path = _path(table)
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf8") as f:
+        return json.load(f)
+
+
+def save(table, ledger):
+    """
+    Save the ledger of a table.
+    """
+    write_json_atomic(_path(table), ledger)
+
+
+def plan(records, table, ledger, in_scope=None, full=False):
+    """
+    Work out which records are new or changed since the last upload, and which previously
+    uploaded items no longer exist. Only ledger entries whose key passes `in_scope` are
+    considered for deletion, so a filtered upload doesn't delete everything else. Returns:
+
+    - puts: iterator of records to put
+    - deletes: iterator of keys of items to delete
+    - counts: number of new, changed, deleted and unchanged items
+    - digests: digest of each record to put, by key
+
+    Everything is worked out lazily so `records` can be streamed: the deletes are only known
+    once the puts have been exhausted, and the counts and digests fill up as they go.
+    """
+    digests = {}
+    seen = set()
+    counts = {"new": 0, "changed": 0, "deleted": 0, "unchanged": 0}
+
+    def puts():
+        for record in records:
+            key = item_key(table, record)
+            digest = item_digest(record)
+            seen.add(key)
+            previous = ledger.get(key)
+            if previous == digest and not full:
+                counts["unchanged"] += 1
+                continue
+            counts["new" if previous is None else "changed"] += 1
+            digests[key] = digest
+            yield record
+
+    def deletes():
+        for key in ledger:
+            values = json.loads(key)
+            if key not in seen and (in_scope is None or in_scope(*values)):
+                counts["deleted"] += 1
+                yield dict(zip(KEYS[table], values))
+
+    return {"puts": puts(), "deletes": deletes(), "counts": counts, "digests": digests}
+
+
+def log_plan(table, plan):
+    """
+    Log a summary of an upload plan.
+    """
+    counts = plan["counts"]
+    logging.info(
+        f"{table}: {counts['new']:,} new, {counts['changed']:,} changed, "
+        f"{counts['deleted']:,} deleted and {counts['unchanged']:,} unchanged items"
+    )
+
+
+class Checkpoint:
+    """
+    Applies the requests of an upload to a ledger as they get written, saving it every so
+    often so that an interrupted upload picks up where it stopped.
+    """
+
+    def __init__(self, table, ledger, digests, every=10):
+        self.table = table
+        self.ledger = dict(ledger)
+        self.digests = digests
+        self.every = every
+        self.saved = time.monotonic()
+        self.lock = threading.Lock()
+
+    def __call__(self, requests):
+        with self.lock:
+            for kind, item in requests:
+                key = item_key(self.table, item)
+                if kind == "put":
+                    self.ledger[key] = self.digests[key]
+                else:
+                    self.ledger.pop(key, None)
+            if time.monotonic() - self.saved >= self.every:
+                self._save()
+
+    def save(self):
+        with self.lock:
+            self._save()
+
+    def _save(self):
+        save(self.table, self.ledger)
+        self.saved = time.monotonic()
+
+
+def item_key(table, item):
+    """
+    Json-encoded primary key of an item.
+    """
+    return json.dumps([item[k] for k in KEYS[table]], ensure_ascii=False)
+
+
+def item_digest(item):
+    """
+    Digest of the contents of an item.
+    """
+    blob = json.dumps(item, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_hex)
+    return hashlib.blake2b(blob.encode("utf8"), digest_size=16).hexdigest()
+
+
+def _hex(value):
+    if isinstance(value, bytes):  # <- binary attributes
+        return value.hex()
+    raise TypeError(f"Can't digest {type(value).__name__}")
+
+
+def _path(table):
+    return get_cache_path("uploads", f"{table}.json")
@@ -1,14 +1,15 @@
-import json
 import logging
 import re
 import unicodedata
 
 from functools import lru_cache
 
-from .translit import transliterate_greek
-from .utils import download, get_cache_path
+from . import staging
+from .translit import transliterate_records
+from .utils import download_many, get_cache_path
 
 
+VERSION = 1  # <- bump if the parsed output or strongs mapping changes
 _URL = "https://ccat.sas.upenn.edu/gopher/text/religion/biblical/parallel/{file}.par"
 _FILES = {
     # Torah
@@ -56,26 +57,22 @@ _FILES = {
 }
 
 
-def create_lxx():
-    """Create LXX records."""
-    records = []
-    for code, fname in _FILES.items():
-        logging.info(f"Working on {code}")
-        path = _download(fname)
-        records.extend(_parse(code, path))
+def download_lxx(revalidate=False):
+    """Download (if need be) every book of the LXX, returning their paths by book id."""
+    paths = {code: _path(fname) for code, fname in _FILES.items()}
+    download_many([(_URL.format(file=fname), paths[code]) for code, fname in _FILES.items()], revalidate=revalidate)
+    return paths
 
-    logging.info("Performing transliteration")
-    for record in records:
-        for token in record["tokens"]:
-            token["tlit"] = transliterate_greek(token["text"])
-    return records
 
+def create_lxx_book(code):
+    """Create the LXX records of an (already downloaded) book."""
+    logging.info(f"Working on {code}")
+    records = list(_parse(code, _path(_FILES[code])))
+    return transliterate_records(records, "grlxx")
 
-def _download(fname):
-    url = _URL.format(file=fname)
-    path = get_cache_path("raw", "grlxx", f"{fname}.par")
-    download(url, path)
-    return path
+
+def _path(fname):
+    return get_cache_path("raw", "grlxx", f"{fname}.par")
 
   
 def _parse(code, path):
@@ -206,13 +203,12 @@ _TO_GREEK = {
 @lru_cache(maxsize=1)
 def strongs_map():
     """Mapping from (chapter, verse, word-repr) -> list of strongs refs."""
-    path = get_cache_path("staging", "hewlc.json")
-    if not path.exists():
+    if not staging.exists("hewlc"):
         raise ValueError("We need to stage `hewlc` before we can do `grlxx`")
     
     strongs = {}
-    with path.open(encoding="utf8") as f:
-        for verse in json.load(f):
+    with staging.load("hewlc") as staged:
+        for verse in staged:
             prefix = verse["chapterId"], verse["verseNum"]
             for token in verse["tokens"]:
                 if token["type"] == "w":
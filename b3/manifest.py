@@ -0,0 +1,78 @@
+"""
+Build manifest, so that only artifacts whose inputs have changed get rebuilt.
+
+Each artifact (e.g. a staged translation, one book of it or `strongs.json`) is recorded
+with a fingerprint of everything it was built from - the hashes of its source files, the
+versions of the code that built it and the output hashes of the artifacts it depends on -
+along with the hash of its own output. Since dependents fingerprint the *output* of their
+dependencies, rebuilding an artifact to something different invalidates them all.
+"""
+import json
+import threading
+
+from .utils import file_sha256, get_cache_path, write_json_atomic
+
+
+_LOCK = threading.Lock()
+
+
+def fingerprint(sources=(), versions=None, depends=()):
+    """
+    Fingerprint the inputs of an artifact.
+    """
+    root = get_cache_path()
+    return {
+        "sources": {str(path.relative_to(root)): file_sha256(path) for path in sources},
+        "versions": versions or {},
+        "depends": {name: output_hash(name) for name in depends},
+    }
+
+
+def is_fresh(name, inputs, path):
+    """
+    Whether an artifact was built from exactly these inputs and is still intact.
+    """
+    entry = _read().get(name)
+    return bool(
+        entry
+        and entry["inputs"] == inputs
+        and path.exists()
+        and file_sha256(path) == entry["output"]
+    )
+
+
+def record(name, inputs, path):
+    """
+    Record that an artifact has just been built from these inputs.
+    """
+    entry = {"inputs": inputs, "output": file_sha256(path)}
+    with _LOCK:
+        manifest = _read()
+        manifest[name] = entry
+        write_json_atomic(_path(), manifest)
+
+
+def output_hash(name):
+    """
+    Hash of the last recorded output of an artifact (or None if it hasn't been built).
+    """
+    return _read().get(name, {}).get("output")
+
+
+def is_recorded(name):
+    """
+    Whether an artifact has ever been built.
+    """
+    return name in _read()
+
+
+def _read():
+    path = _path()
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf8") as f:
+        return json.load(f)
+
+
+def _path():
+    return get_cache_path("staging", "build.json")
@@ -1,9 +1,8 @@
 import logging
 
 from .parser.osis import parse_osis
-from .translit.greek import transliterate_greek
-from .translit.hebrew import transliterate_hebrew
-from .utils import download, get_cache_path
+from .translit import transliterate_records
+from .utils import download, download_many, get_cache_path
 
 
 _BOOK_IDS = [
@@ -18,39 +17,47 @@ _GRTISCH_URL = "https://raw.githubusercontent.com/morphgnt/tischendorf-data/mast
 
 def fetch_translation_from_openscriptures(translation):
     """
-    Parse openscriptures xml-files and make my own json ones, then upload to dynamodb.
+    Parse the Tischendorf xml-file and make my own json records. (The WLC is done book by
+    book instead, see `fetch_hewlc_book`.)
     """
-    if translation == "hewlc":
-        records = []
-        for book_id in _BOOK_IDS:
-            logging.info(f"Working on {book_id}")
-            path = _download_hewlc(book_id)
-            records.extend(parse_osis(path, w_tag_parser="hebrew"))
-        logging.info("Performing transliteration")
-        _transliterate(records, func=transliterate_hebrew)
+    path = download_grtisch()
+    records = parse_osis(path, w_tag_parser="greek")
+    transliterate_records(records, translation)
+    return records
+
 
-    elif translation == "grtisch":
-        path = _download_grtisch()
-        records = parse_osis(path, w_tag_parser="greek")
-        _transliterate(records, func=transliterate_greek)
+def download_hewlc(revalidate=False):
+    """
+    Download (if need be) every book of the WLC, returning their paths by book id.
+    """
+    paths = {book_id: _hewlc_path(book_id) for book_id in _BOOK_IDS}
+    download_many([(_hewlc_url(book_id), path) for book_id, path in paths.items()], revalidate=revalidate)
+    return paths
 
+
+def fetch_hewlc_book(book_id):
+    """
+    Parse and transliterate an (already downloaded) book of the WLC.
+    """
+    logging.info(f"Working on {book_id}")
+    records = parse_osis(_hewlc_path(book_id), w_tag_parser="hebrew")
+    transliterate_records(records, "hewlc")
     return records
 
 
-def _download_hewlc(book_id):
-    url = f"{_HEWLC_ROOT_URL}/{book_id}.xml"
-    path = get_cache_path("raw", "hewlc", f"{book_id.lower()}_osis.xml")
-    download(url, path)
-    return path
+def _hewlc_url(book_id):
+    return f"{_HEWLC_ROOT_URL}/{book_id}.xml"
+
+
+def _hewlc_path(book_id):
+    return get_cache_path("raw", "hewlc", f"{book_id.lower()}_osis.xml")
 
 
-def _download_grtisch():
+def download_grtisch(revalidate=False):
+    """
+    Download (if need be) the Tischendorf xml-file, returning its path.
+    """
     path = get_cache_path("raw", "grtisch", "grtisch_osis.xml")
-    download(_GRTISCH_URL, path)
+    download(_GRTISCH_URL, path, revalidate=revalidate)
     return path
 
-
-def _transliterate(records, func):
-    for record in records:
-        for token in record["tokens"]:
-            token["tlit"] = func(token["text"])
@@ -1,8 +1,19 @@
+import itertools
 import re
-import unicodedata
-import xml.etree.ElementTree as ET
 
-from pathlib import Path
+from collections import deque
+from operator import itemgetter
+
+from .xmlstream import iter_elements
+
+
+VERSION = 1  # <- bump if the parsed output changes
+
+# Tokens are only released once this many newer ones exist, since a trailing seg/tail
+# can be merged into the previous token and a qere reading replaces the last few.
+_LOOKBEHIND = 32
+_WHITESPACE_RE = re.compile(r"\s+")
+_STYLING_SEGS = {"x-small", "x-large", "x-suspended"}
 
 
 def parse_osis(path, w_tag_parser="default", use_kjv_versification=True):
@@ -17,32 +28,46 @@ def parse_osis(path, w_tag_parser="default", use_kjv_versification=True):
         - type: the token type ("w", "o", "pre" or "punc")
         - strongs: (optional) strongs reference
     """
-    with Path(path).open("r", encoding="utf8") as f:
-        xmlstr = f.read()
-        xmlstr = re.sub(r" xmlns=['\"][^'\"]+['\"]", "", xmlstr, count=1)
-        xmlstr = re.sub(r'\<seg type="x\-small"\>(.*?)\</seg\>', r"\g<1>", xmlstr)
-        xmlstr = re.sub(r'\<seg type="x\-large"\>(.*?)\</seg\>', r"\g<1>", xmlstr)
-        xmlstr = re.sub(r'\<seg type="x\-suspended"\>(.*?)\</seg\>', r"\g<1>", xmlstr)
+    return list(iter_osis(path, w_tag_parser, use_kjv_versification))
+
+
+def iter_osis(path, w_tag_parser="default", use_kjv_versification=True):
+    """Stream json-ified verses (see `parse_osis`) from an OSIS file."""
     if isinstance(w_tag_parser, str):
         w_tag_parser = _W_TAG_PARSERS[w_tag_parser]
-    tree = ET.fromstring(xmlstr)
-    tokens = _tokenize(tree, w_tag_parser, use_kjv_versification)
-    return list(_group_tokens(tokens))
+    elems = iter_elements(path, tail_tags={"w", "seg"})
+    tokens = _tokenize(elems, w_tag_parser, use_kjv_versification)
+    return _group_tokens(tokens)
 
 
-def _tokenize(tree, w_tag_parser, use_kjv_versification):
-    """Make a list of verses with the following schema:
+def _tokenize(elems, w_tag_parser, use_kjv_versification):
+    """Iterate over (verse id, token) pairs, where the verse id is (chapterId, verseNum)
+    and each token has the following schema:
 
-    - chapterId: the OSIS ID for a chapter
-    - verseNum: verse number
     - text: the token text
     - type: the token type ("w", "pre" or "punc")
     - strongs: (optional) strongs reference
     """
-    tokens = []
+    tokens = deque()
     root = None
     catch_word = False
-    for elem in tree.iter():
+    word = None
+    for elem in elems:
+        # Only the last few tokens can still change
+        while len(tokens) > _LOOKBEHIND:
+            yield tokens.popleft()
+
+        # Small/large/suspended letters are only styling, so they're read as part of the
+        # word they're in (or as part of the text between words if they're not in one)
+        if elem.tag == "seg" and elem.attrib.get("type") in _STYLING_SEGS:
+            if word is None or not any(child is elem for child in word):
+                text = (elem.text or "") + (elem.tail or "")
+                if text:
+                    _handle_tail(tokens, root, text)
+            continue
+        if elem.tag == "w":
+            word = elem
+
         # Handle verses
         if elem.tag == "verse" and "osisID" in elem.attrib:
             root = _parse_osis_id(elem.attrib["osisID"])
@@ -61,7 +86,7 @@ def _tokenize(tree, w_tag_parser, use_kjv_versification):
             for token in rdg_tokens:
                 tokens.append(token)
             # assume its a space after this
-            tokens.append({**root, **{"type": "punc", "text": " "}})
+            tokens.append((root, {"type": "punc", "text": " "}))
             catch_word = False
             continue
 
@@ -72,27 +97,31 @@ def _tokenize(tree, w_tag_parser, use_kjv_versification):
             continue
 
         # Handle words, segs and tails
-        if elem.tag == "w" and elem.text:
+        if elem.tag == "w" and _text(elem):
             _handle_w(tokens, root, elem, w_tag_parser)
 
         elif elem.tag == "seg":
             _handle_seg(tokens, root, elem)
     
         if elem.tail:
-            _handle_tail(tokens, root, elem)
+            _handle_tail(tokens, root, elem.tail)
 
-    return tokens
+    yield from tokens
 
 
 def _parse_osis_id(ref):
     cid, vnum = ref.rsplit('.', 1)
-    return {"chapterId": cid, "verseNum": int(vnum)}
+    return cid, int(vnum)
+
+
+def _text(elem):
+    """Text of an element, including that of any (styling) elements within it."""
+    return "".join(elem.itertext()) if len(elem) else elem.text
 
 
 def _handle_w(tokens, root, elem, w_tag_parser):
-    text = unicodedata.normalize("NFD", elem.text or "")  # ensure chars and accents are separated
-    for type_, text, strongs in w_tag_parser(elem.text, lemma=elem.attrib["lemma"]):
-        tokens.append({**root, **{"type": type_, "text": text, "strongs": strongs}})
+    for type_, text, strongs in w_tag_parser(_text(elem), lemma=elem.attrib["lemma"]):
+        tokens.append((root, {"type": type_, "text": text, "strongs": strongs}))
 
 
 def _handle_seg(tokens, root, elem):
@@ -104,33 +133,26 @@ def _handle_seg(tokens, root, elem):
         'x-samekh': '(\u05E1)',
         'x-sof-pasuq': '\u05C3',
     }[elem.attrib['type']]
-    if tokens[-1]["type"] == "punc":
-        tokens[-1]["text"] += seg
+    if tokens[-1][1]["type"] == "punc":
+        tokens[-1][1]["text"] += seg
     else:
-        tokens.append({**root, **{"type": "punc", "text": seg}})
+        tokens.append((root, {"type": "punc", "text": seg}))
 
 
-def _handle_tail(tokens, root, elem):
-    tail = elem.tail.replace("\n", " ")
-    tail = re.sub(r"\s+", " ", tail)
-    if tokens[-1]["type"] == "punc":
-        tokens[-1]["text"] += tail
+def _handle_tail(tokens, root, tail):
+    if tail != " ":
+        tail = _WHITESPACE_RE.sub(" ", tail.replace("\n", " "))
+    if tokens[-1][1]["type"] == "punc":
+        tokens[-1][1]["text"] += tail
     else:
-        tokens.append({**root, **{"type": "punc", "text": tail}})
+        tokens.append((root, {"type": "punc", "text": tail}))
 
 
 def _group_tokens(tokens):
     """Group tokens by verse."""
-    prev_vid = None
-    buffer = []
-    for x in tokens:
-        vid = {"chapterId": x.pop("chapterId"), "verseNum": x.pop("verseNum")}
-        if prev_vid and prev_vid != vid:
-            yield {**prev_vid, **{"tokens": buffer}}
-            buffer = []
-        prev_vid = vid
-        buffer.append(x)
-    yield {**vid, **{"tokens": buffer}}
+    for vid, group in itertools.groupby(tokens, key=itemgetter(0)):
+        cid, vnum = vid
+        yield {"chapterId": cid, "verseNum": vnum, "tokens": [token for _, token in group]}
 
 
 def _parse_default_w_tag(text, lemma=None):
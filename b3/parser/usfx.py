@@ -1,35 +1,39 @@
 import itertools
 import re
-import xml.etree.ElementTree as ET
 
-from pathlib import Path
+from .xmlstream import iter_elements
 
 
+VERSION = 1  # <- bump if the parsed output changes
+
+_WRAPPER_RE = re.compile(rb"</?(?:wj|nd)>")
+
 def parse_usfx(path):
     """Parse mental USFX format to big list of tokenized verses."""
-    with Path(path).open("r", encoding="utf8") as f:
-        xmlstr = f.read()
-        xmlstr = re.sub(r" xmlns=['\"][^'\"]+['\"]", "", xmlstr, count=1)
-        xmlstr = re.sub(r"</?wj>", "", xmlstr)
-        xmlstr = re.sub(r"</?nd>", "", xmlstr)
-    tree = ET.fromstring(xmlstr)
-    token_iter = _iter_tokens(tree)
+    return list(iter_usfx(path))
+
+
+def iter_usfx(path):
+    """Stream tokenized verses from a USFX file without loading the whole document.
+
+    The `wj` (words of Jesus) and `nd` (name of deity) wrappers are dropped as the
+    file is read, so their text merges into the surrounding text.
+    """
+    elems = iter_elements(path, tail_tags={"v", "w", "f"}, strip=_WRAPPER_RE)
+    token_iter = _iter_tokens(elems)
     grouper = itertools.groupby(token_iter, key=lambda x: x[0])
-    records = [
-        {
+    for (cid, vnum), group in grouper:
+        yield {
             "chapterId": cid,
             "verseNum": vnum,
             "tokens": [tokens for _, tokens in group],
         }
-        for (cid, vnum), group in grouper
-    ]
-    return records
-    
-    
-def _iter_tokens(tree):
+
+
+def _iter_tokens(elems):
     """Iterate over every token in every verse."""
     vid = None
-    for e in tree.iter():  # iterates recursively through the doc
+    for e in elems:  # iterates recursively through the doc
         # Handle verse count
         if e.tag in {"book", "ve"}:
             vid = None
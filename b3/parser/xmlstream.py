@@ -0,0 +1,109 @@
+import re
+import xml.etree.ElementTree as ET
+
+from pathlib import Path
+
+
+_CHUNK_SIZE = 16 * 1024  # <- smaller chunks keep fewer elements alive across gc generations
+_ROOT_RE = re.compile(rb"<[^?!][^>]*>")  # <- the root's start tag (i.e. the first that isn't a declaration)
+_XMLNS_RE = re.compile(rb" xmlns=['\"][^'\"]+['\"]")
+
+
+def iter_elements(path, tail_tags=(), strip=None):
+    """Stream elements from an xml file in document order (i.e. like `tree.iter()`).
+
+    Elements are yielded as soon as their `text` is known and, for tags in `tail_tags`,
+    their `tail`. The default namespace is dropped (so tags have no namespace) and any tags
+    matching the bytes regex `strip` are removed before parsing, so their text flows into
+    the surrounding text/tail.
+
+    The tree is built in C as the file is fed to the parser and, after each chunk, every
+    finished subtree is walked with `iter()` (also in C) and then dropped, so only the
+    open branch of the document is kept in memory.
+    """
+    tail_tags = set(tail_tags)
+    parser = ET.XMLPullParser(events=("start",))  # <- only to get hold of the root
+    root = None
+    opened = []  # the open branch of the document, as far as it's been yielded
+    for chunk in _iter_chunks(path, strip):
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if root is None:
+                root = elem
+        if root is not None:
+            yield from _drain(root, opened, tail_tags, final=False)
+    parser.close()
+    if root is not None:
+        yield from _drain(root, opened, tail_tags, final=True)
+
+
+def _iter_chunks(path, strip=None):
+    """Read the file in chunks, without the default namespace or `strip`ped tags.
+
+    Each chunk ends before its last "<", so no tag is ever split between two chunks.
+    """
+    pending = b""
+    started = False  # <- whether the root's start tag (with the namespace) has been read
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            chunk = pending + chunk
+            if not started:
+                match = _ROOT_RE.search(chunk)
+                if match is None:
+                    pending = chunk
+                    continue
+                root = _XMLNS_RE.sub(b"", match.group(), count=1)
+                chunk = chunk[:match.start()] + root + chunk[match.end():]
+                started = True
+            cut = chunk.rfind(b"<")
+            chunk, pending = (chunk[:cut], chunk[cut:]) if cut >= 0 else (chunk, b"")
+            yield strip.sub(b"", chunk) if strip else chunk
+    if pending:
+        yield strip.sub(b"", pending) if strip else pending
+
+
+def _drain(root, opened, tail_tags, final):
+    """Yield (and drop) everything under the root that's finished, in document order.
+
+    All but the last child of an element are finished, as is the last one once the
+    document is. An open element is yielded once it has a child (so its text is known)
+    unless its tail is wanted too, in which case it waits until it's finished.
+    """
+    if not opened:
+        if not (final or len(root)):
+            return
+        yield root
+        opened.append(root)
+    level = 0
+    while True:
+        node = opened[level]
+        children = list(node)
+        last = children.pop() if children and not final else None
+        for child in children:
+            if level + 1 < len(opened) and child is opened[level + 1]:
+                yield from _rest(opened[level + 1:])
+                del opened[level + 1:]
+            else:
+                yield from child.iter()
+        del node[:len(children)]
+        if last is None:
+            return
+        if level + 1 < len(opened):  # <- i.e. `last` is already open
+            level += 1
+            continue
+        if not len(last) or last.tag in tail_tags:
+            return
+        yield last
+        opened.append(last)
+        level += 1
+
+
+def _rest(branch):
+    """Yield what hasn't been yet of a finished element that was yielded while open."""
+    elem = branch[0]
+    for child in elem:
+        if len(branch) > 1 and child is branch[1]:
+            yield from _rest(branch[1:])
+        else:
+            yield from child.iter()
+    del elem[:]
@@ -0,0 +1,117 @@
+"""
+Posting lists of the B3Search table: for each strongs id, the verses it's in (in canonical
+order) and how many times it's in each.
+
+Verses are packed into integer ids, `book << 16 | chapter << 8 | verse` where the book is
+its index in `books.json` (so the top bits, `book << 8 | chapter`, are a chapter key). A
+posting list has a segment per chapter behind a directory of fixed-width arrays:
+
+    version | nchapters | keys | verses | refs | offsets | segment | segment | ...
+
+where the version and nchapters are varints, `keys` are the chapter keys (little-endian
+uint16s) and `verses`, `refs` and `offsets` are the number of verses, references and
+segment bytes before each chapter and after the last (little-endian uint32s). So the totals
+and position of any run of books or chapters are a couple of lookups away, and the
+directory loads straight into arrays without decoding anything.
+
+Each posting of a segment is the gap from the previous verse number (starting from -1, so
+each segment decodes on its own) shifted left one bit, with the low bit set if the count
+isn't 1 (in which case the count follows) - all varints. So most postings take a byte,
+rather than the ~15 bytes of `["Gen.1.1",1],`.
+
+The decoder is in `api/postings.py`.
+"""
+from array import array
+from functools import lru_cache
+from itertools import groupby
+import sys
+
+from .books import get_books
+
+
+VERSION = 2  # <- bump if the format changes (and update api/postings.py)
+
+
+def verse_id(chapter_id, verse_num):
+    """
+    Pack a verse into an integer id, e.g. ("Gen.1", 2) -> 0 << 16 | 1 << 8 | 2.
+    """
+    book, _, chapter = chapter_id.rpartition(".")
+    chapter, verse_num = int(chapter), int(verse_num)
+    if not (0 < chapter < 256 and 0 <= verse_num < 256):
+        raise ValueError(f"Can't pack {chapter_id}.{verse_num} into a verse id")
+    return _book_index()[book] << 16 | chapter << 8 | verse_num
+
+
+def verse_ref(vid):
+    """
+    Unpack a verse id into a ref, e.g. 0 << 16 | 1 << 8 | 2 -> "Gen.1.2".
+    """
+    return f"{_book_codes()[vid >> 16]}.{vid >> 8 & 0xFF}.{vid & 0xFF}"
+
+
+def encode(postings):
+    """
+    Encode a list of (verse id, count) pairs, sorted by verse id, as a posting list.
+    """
+    keys = array("H")
+    verses, refs, offsets = array("I", [0]), array("I", [0]), array("I", [0])
+    segments = bytearray()
+    for key, group in groupby(postings, key=lambda posting: posting[0] >> 8):
+        if keys and key <= keys[-1]:
+            raise ValueError("Postings must be sorted by verse id (without repeats)")
+        segment, nverses, nrefs = _segment(group)
+        keys.append(key)
+        verses.append(verses[-1] + nverses)
+        refs.append(refs[-1] + nrefs)
+        offsets.append(offsets[-1] + len(segment))
+        segments += segment
+    out = bytearray()
+    _varint(out, VERSION)
+    _varint(out, len(keys))
+    for directory in [keys, verses, refs, offsets]:
+        if sys.byteorder == "big":
+            directory.byteswap()
+        out += directory.tobytes()
+    return bytes(out + segments)
+
+
+def _segment(postings):
+    """
+    Encode the postings of a single chapter, returning them and how many verses and
+    references they're for.
+    """
+    out = bytearray()
+    previous = -1
+    nverses = nrefs = 0
+    for vid, count in postings:
+        verse_num = vid & 0xFF
+        gap = verse_num - previous
+        if gap <= 0:
+            raise ValueError("Postings must be sorted by verse id (without repeats)")
+        if count == 1:
+            _varint(out, gap << 1)
+        else:
+            _varint(out, gap << 1 | 1)
+            _varint(out, count)
+        previous = verse_num
+        nverses += 1
+        nrefs += count
+    return out, nverses, nrefs
+
+
+def _varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+@lru_cache(maxsize=1)
+def _book_index():
+    return {code: i for i, code in enumerate(get_books())}
+
+
+@lru_cache(maxsize=1)
+def _book_codes():
+    return list(get_books())
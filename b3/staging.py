@@ -0,0 +1,305 @@
+"""
+Compact binary staging format for tokenized translations.
+
+A staged translation is a list of verses, each with a list of tokens (text, type and
+optionally strongs and tlit). Rather than one giant JSON array, it's stored as:
+
+    magic (4 bytes) | header length (u32) | header (JSON) | sections...
+
+where the header holds the chapter index, i.e. `[chapterId, first verse, end verse]`, plus
+the byte offset and length of each section. The sections are little-endian u32 arrays:
+
+- `str_offsets`/`str_data`: interned string table of utf8 bytes
+- `tok_text`, `tok_type`, `tok_tlit`: string ids for each distinct token (or `_NONE`)
+- `tok_strongs`/`strongs`: offsets into a flat array of strongs string ids
+- `tok_flags`: whether each distinct token has a strongs list and/or tlit
+- `verse_num`/`verse_tokens`: verse numbers and offsets into `verse_token_ids`
+- `verse_token_ids`: distinct token ids making up each verse
+
+Verses of a chapter are stored contiguously (in the order they were first seen), so any
+chapter or verse can be read straight from the memory-mapped file.
+"""
+from array import array
+import json
+import mmap
+import os
+import struct
+import sys
+
+from .utils import get_cache_path
+
+
+MAGIC = b"B3S1"
+VERSION = 1
+_NONE = 0xFFFFFFFF
+_HAS_STRONGS = 1
+_HAS_TLIT = 2
+_SECTIONS = [
+    "str_offsets", "str_data",
+    "tok_text", "tok_type", "tok_tlit", "tok_flags", "tok_strongs", "strongs",
+    "verse_num", "verse_tokens", "verse_token_ids",
+]
+
+
+def staging_path(version):
+    """
+    Path of a staged translation.
+    """
+    return get_cache_path("staging", f"{version}.b3s")
+
+
+def part_path(version, part):
+    """
+    Path of part (e.g. a book) of a translation that is staged bit by bit.
+    """
+    return get_cache_path("staging", version, f"{part}.b3s")
+
+
+def exists(version):
+    """
+    Whether a translation has been staged.
+    """
+    return staging_path(version).exists()
+
+
+def save(records, version):
+    """
+    Save tokenized verses of a translation to staging, returning the number saved.
+    """
+    return write(records, staging_path(version))
+
+
+def load(version):
+    """
+    Open a staged translation for reading (use as a context manager to close it).
+    """
+    path = staging_path(version)
+    if not path.exists():
+        raise RuntimeError(f"Make sure you've run `python b3 stage {version}`")
+    return StagingFile(path)
+
+
+def export_json(version, path=None):
+    """
+    Export a staged translation as a JSON array, e.g. for debugging.
+    """
+    path = path or get_cache_path("staging", f"{version}.json")
+    with load(version) as staged, open(path, "w", encoding="utf8") as f:
+        json.dump(list(staged), f, ensure_ascii=False)
+    return path
+
+
+def write(records, path):
+    """
+    Write tokenized verses to a staging file, returning the number of verses written.
+    """
+    strings = {}
+    tokens = {}
+    cols = {name: array("I") for name in _SECTIONS if name != "str_data"}
+    cols["str_offsets"].append(0)
+    cols["tok_strongs"].append(0)
+    str_data = bytearray()
+
+    def intern(text):
+        if text is None:
+            return _NONE
+        id_ = strings.get(text)
+        if id_ is None:
+            id_ = strings[text] = len(strings)
+            str_data.extend(text.encode("utf8"))
+            cols["str_offsets"].append(len(str_data))
+        return id_
+
+    def token_id(token):
+        strongs = token.get("strongs")
+        key = token["text"], token["type"], token.get("tlit"), None if strongs is None else tuple(strongs)
+        id_ = tokens.get(key)
+        if id_ is None:
+            id_ = tokens[key] = len(tokens)
+            cols["tok_text"].append(intern(key[0]))
+            cols["tok_type"].append(intern(key[1]))
+            cols["tok_tlit"].append(intern(key[2]))
+            cols["tok_flags"].append((_HAS_STRONGS if strongs is not None else 0) | (_HAS_TLIT if key[2] is not None else 0))
+            cols["strongs"].extend(intern(ref) for ref in strongs or [])
+            cols["tok_strongs"].append(len(cols["strongs"]))
+        return id_
+
+    # Group verses by chapter, in the order chapters first appear
+    by_chapter = {}
+    for record in records:
+        ids = array("I", [token_id(token) for token in record["tokens"]])
+        by_chapter.setdefault(record["chapterId"], []).append((record["verseNum"], ids))
+
+    chapters = []
+    cols["verse_tokens"].append(0)
+    for cid, verses in by_chapter.items():
+        start = len(cols["verse_num"])
+        for vnum, ids in verses:
+            cols["verse_num"].append(vnum)
+            cols["verse_token_ids"].extend(ids)
+            cols["verse_tokens"].append(len(cols["verse_token_ids"]))
+        chapters.append([cid, start, len(cols["verse_num"])])
+
+    # Lay out the sections (4-byte aligned) after the header
+    blobs = {name: _to_le_bytes(col) for name, col in cols.items()}
+    blobs["str_data"] = bytes(str_data)
+    header = {"version": VERSION, "chapters": chapters, "sections": {}}
+    offset = 0
+    for name in _SECTIONS:
+        header["sections"][name] = [offset, len(blobs[name])]
+        offset += _aligned(len(blobs[name]))
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf8")
+    base = _aligned(len(MAGIC) + 4 + len(header_bytes))
+
+    tmp_path = path.with_name(f".{path.name}.part")
+    with tmp_path.open("wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+        f.write(b"\0" * (base - f.tell()))
+        for name in _SECTIONS:
+            f.write(blobs[name])
+            f.write(b"\0" * (_aligned(len(blobs[name])) - len(blobs[name])))
+    os.replace(tmp_path, path)
+    return len(cols["verse_num"])
+
+
+class StagingFile:
+    """
+    Memory-mapped reader for a staging file. Iterating gives json-ified verses:
+
+    - chapterId: the OSIS ID for a chapter
+    - verseNum: verse number
+    - tokens: list of tokens with text, type and (if present) strongs and tlit
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:4] != MAGIC:
+            raise ValueError(f"{path} is not a staging file")
+        (header_len,) = struct.unpack_from("<I", self._mmap, 4)
+        header = json.loads(self._mmap[8:8 + header_len].decode("utf8"))
+        base = _aligned(8 + header_len)
+        view = self._view = memoryview(self._mmap)
+        self._sections = {}
+        for name, (offset, length) in header["sections"].items():
+            section = view[base + offset: base + offset + length]
+            self._sections[name] = section if name == "str_data" else _from_le_bytes(section)
+        self._chapters = {cid: (start, end) for cid, start, end in header["chapters"]}
+        self._strings = [None] * (len(self._sections["str_offsets"]) - 1)
+        self._tokens = [None] * len(self._sections["tok_text"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map.
+        """
+        self._strings = self._tokens = None
+        for section in self._sections.values():
+            if isinstance(section, memoryview):
+                section.release()
+        self._sections = {}
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __len__(self):
+        return len(self._sections["verse_num"])
+
+    def __iter__(self):
+        for cid in self._chapters:
+            yield from self.chapter(cid)
+
+    def chapters(self):
+        """
+        Chapter ids in the order they were staged.
+        """
+        return list(self._chapters)
+
+    def chapter(self, chapter_id):
+        """
+        All verses in a chapter (or an empty list if it isn't in this translation).
+        """
+        start, end = self._chapters.get(chapter_id, (0, 0))
+        return [self._verse(chapter_id, i) for i in range(start, end)]
+
+    def verse(self, chapter_id, verse_num):
+        """
+        A single verse, or None if it doesn't exist.
+        """
+        start, end = self._chapters.get(chapter_id, (0, 0))
+        nums = self._sections["verse_num"]
+        for i in range(start, end):
+            if nums[i] == verse_num:
+                return self._verse(chapter_id, i)
+        return None
+
+    def iter_strongs(self):
+        """
+        Iterate over (chapterId, verseNum, strongs ids) for every verse, without building tokens.
+        """
+        s = self._sections
+        for cid, (start, end) in self._chapters.items():
+            for i in range(start, end):
+                strongs = []
+                for id_ in s["verse_token_ids"][s["verse_tokens"][i]:s["verse_tokens"][i + 1]]:
+                    strongs.extend(self._string(ref) for ref in s["strongs"][s["tok_strongs"][id_]:s["tok_strongs"][id_ + 1]])
+                yield cid, s["verse_num"][i], strongs
+
+    def _verse(self, chapter_id, i):
+        s = self._sections
+        ids = s["verse_token_ids"][s["verse_tokens"][i]:s["verse_tokens"][i + 1]]
+        return {
+            "chapterId": chapter_id,
+            "verseNum": s["verse_num"][i],
+            "tokens": [self._token(id_) for id_ in ids],
+        }
+
+    def _token(self, id_):
+        proto = self._tokens[id_]
+        if proto is None:
+            s = self._sections
+            proto = {"type": self._string(s["tok_type"][id_]), "text": self._string(s["tok_text"][id_])}
+            flags = s["tok_flags"][id_]
+            if flags & _HAS_STRONGS:
+                proto["strongs"] = tuple(self._string(ref) for ref in s["strongs"][s["tok_strongs"][id_]:s["tok_strongs"][id_ + 1]])
+            if flags & _HAS_TLIT:
+                proto["tlit"] = self._string(s["tok_tlit"][id_])
+            self._tokens[id_] = proto
+        token = proto.copy()
+        if "strongs" in token:
+            token["strongs"] = list(token["strongs"])
+        return token
+
+    def _string(self, id_):
+        if id_ == _NONE:
+            return None
+        text = self._strings[id_]
+        if text is None:
+            offsets = self._sections["str_offsets"]
+            text = self._strings[id_] = bytes(self._sections["str_data"][offsets[id_]:offsets[id_ + 1]]).decode("utf8")
+        return text
+
+
+def _aligned(n):
+    return (n + 3) & ~3
+
+
+def _to_le_bytes(col):
+    if sys.byteorder == "big":
+        col = array(col.typecode, col)
+        col.byteswap()
+    return col.tobytes()
+
+
+def _from_le_bytes(view):
+    if sys.byteorder == "big":
+        col = array("I", view.tobytes())
+        col.byteswap()
+        return col
+    return view.cast("I")
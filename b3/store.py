@@ -0,0 +1,77 @@
+"""
+Indexed files bundled with the lambda, so it can look things up without loading (or going
+to dynamodb for) everything:
+
+- verse store: a zlib-compressed block per chapter, holding the json list of its verse
+  items as uploaded to B3Bibles (index values are offset, length and uncompressed length)
+- strongs index: a json block per strongs entry (index values are offset and length)
+
+Each file is its magic bytes, then the blocks and finally an index of where each block is,
+followed by the length of the index:
+
+    MAGIC | block | block | ... | index json | u32 index length
+
+The readers are in `api/store.py`.
+"""
+from itertools import groupby
+import json
+import logging
+from operator import itemgetter
+import os
+import struct
+import zlib
+
+from . import bibles
+
+
+VERSE_MAGIC = b"B3V1"
+STRONGS_MAGIC = b"B3X1"
+VERSION = 2  # <- bump if the formats change (and update api/store.py)
+
+
+def write(path, in_scope=None):
+    """
+    Write the staged translations to a verse store, returning the number of chapters.
+    """
+    def blocks():
+        verses = bibles.iter_verses(in_scope=in_scope)
+        for chapter_id, chapter in groupby(verses, key=itemgetter("chapterId")):
+            blob = _to_json(list(chapter))
+            yield chapter_id, zlib.compress(blob, 9), [len(blob)]
+
+    return write_blocks(path, VERSE_MAGIC, blocks())
+
+
+def write_strongs(record, path):
+    """
+    Write the strongs entries of both languages to a strongs index, returning their number.
+    """
+    blocks = (
+        (id_, _to_json(entry), [])
+        for entries in record.values()
+        for id_, entry in entries.items()
+    )
+    return write_blocks(path, STRONGS_MAGIC, blocks)
+
+
+def write_blocks(path, magic, blocks):
+    """
+    Write (key, block, extra index values) to an indexed file, returning the number of blocks.
+    """
+    index = {}
+    tmp_path = path.with_name(path.name + ".part")
+    with tmp_path.open("wb") as f:
+        f.write(magic)
+        for key, block, extra in blocks:
+            index[key] = [f.tell(), len(block), *extra]
+            f.write(block)
+        header = _to_json({"version": VERSION, "index": index})
+        f.write(header)
+        f.write(struct.pack("<I", len(header)))
+    os.replace(tmp_path, path)
+    logging.info(f"Wrote {len(index):,} blocks to {path} ({path.stat().st_size / 2**20:.1f}MB)")
+    return len(index)
+
+
+def _to_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf8")
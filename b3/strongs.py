@@ -1,13 +1,14 @@
+import gzip
 import json
 import logging
 import re
 
-from collections import defaultdict
-
+from . import postings, staging, store
 from .translit import transliterate_greek, transliterate_hebrew
 from .utils import download, get_cache_path
 
 
+VERSION = 1  # <- bump if the format of strongs.json changes
 _STRONGS_OS_URL = "https://raw.githubusercontent.com/openscriptures/strongs/master/{lan}/strongs-{lan}-dictionary.js"
 
 
@@ -27,23 +28,57 @@ def fetch_strongs_from_openscriptures():
     return record
 
 
-def get_references(lan):
+def save_strongs(record, resources_dir):
+    """
+    Save the strongs resources of the api: `strongs.json`, a precompressed copy of it for
+    serving it whole and an index for looking up single entries.
     """
-    Get a mapping from strongs id to list of pairs of (verse ref, count).
+    blob = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf8")
+    (resources_dir / "strongs.json").write_bytes(blob)
+    (resources_dir / "strongs.json.gz").write_bytes(gzip.compress(blob, compresslevel=9, mtime=0))
+    store.write_strongs(record, resources_dir / "strongs.b3x")
+
+
+def get_postings(lan):
+    """
+    Get a mapping from strongs id to its posting list, i.e. pairs of (verse id, count) in
+    canonical order (see `postings.verse_id`).
     """
     translation = {"greek": "grtisch", "hebrew": "hewlc"}[lan]
-    path = get_cache_path("staging", f"{translation}.json")
-    if not path.exists():
-        raise RuntimeError(f"Make sure you've run `python b3 stage {translation}`")
-    references = defaultdict(lambda: defaultdict(int))
-    with path.open(encoding="utf8") as f:
-        for record in json.load(f):
-            ref = f"{record['chapterId']}.{record['verseNum']}"
-            for token in record["tokens"]:
-                for id_ in token.get("strongs", []):
-                    references[id_][ref] += 1
-    references = {id_: list(refs.items()) for id_, refs in references.items()}
-    return references
+    index = {}
+    with staging.load(translation) as staged:
+        for cid, vnum, strongs in staged.iter_strongs():
+            if not strongs:
+                continue
+            vid = postings.verse_id(cid, vnum)
+            for id_ in strongs:
+                counts = index.setdefault(id_, {})
+                counts[vid] = counts.get(vid, 0) + 1
+    return {id_: sorted(counts.items()) for id_, counts in index.items()}
+
+
+def get_references(lan):
+    """
+    Get a mapping from strongs id to list of pairs of (verse ref, count) in canonical order.
+    """
+    return {
+        id_: [(postings.verse_ref(vid), count) for vid, count in plist]
+        for id_, plist in get_postings(lan).items()
+    }
+
+
+def download_strongs(revalidate=False):
+    """
+    Download (if need be) the hebrew and greek js files from openscriptures, returning their paths.
+    """
+    paths = [_js_path(lan) for lan in ["hebrew", "greek"]]
+    for lan, path in zip(["hebrew", "greek"], paths):
+        download(_STRONGS_OS_URL.format(lan=lan), path, revalidate=revalidate)
+    return paths
+
+
+def _js_path(lan):
+    return get_cache_path("raw", "strongs", f"{lan}.js")
 
 
 def _download(lan):
@@ -51,7 +86,7 @@ def _download(lan):
     Download js files from openscriptures and hack into simple json files.
     """
     url = _STRONGS_OS_URL.format(lan=lan)
-    path = get_cache_path("raw", "strongs", f"{lan}.js")
+    path = _js_path(lan)
     download(url, path)
     with path.open(encoding="utf8") as f:
         json_str = ""
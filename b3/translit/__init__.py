@@ -1,2 +1,3 @@
+from .batch import transliterate_records
 from .greek import transliterate_greek
-from .hebrew import transliterate_hebrew
\ No newline at end of file
+from .hebrew import transliterate_hebrew
@@ -0,0 +1,35 @@
+import logging
+import time
+
+from . import greek, hebrew
+
+
+# Transliterators of lots of texts at once, by language (i.e. the start of a translation id)
+_TRANSLITERATORS = {
+    "gr": greek.transliterate_many,
+    "he": hebrew.transliterate_many,
+}
+
+
+def transliterate_records(records, translation):
+    """
+    Add a tlit to every token of some verses of a translation, transliterating each
+    distinct token text just once and scattering the results back to the tokens.
+    """
+    transliterate_many = _TRANSLITERATORS[translation[:2]]
+    t0 = time.perf_counter()
+    tokens = [token for record in records for token in record["tokens"]]
+    index = {}
+    positions = [index.setdefault(token["text"], len(index)) for token in tokens]
+    tlits = transliterate_many(list(index))
+    for token, i in zip(tokens, positions):
+        token["tlit"] = tlits[i]
+
+    elapsed = time.perf_counter() - t0
+    if index:
+        saved = elapsed / len(index) * (len(tokens) - len(index))
+        logging.info(
+            f"...transliterated {len(index):,} distinct of {len(tokens):,} tokens "
+            f"({len(index) / len(tokens):.0%}) in {elapsed:.2f}s, saving ~{saved:.2f}s"
+        )
+    return records
@@ -1,19 +1,36 @@
 import unicodedata
 
 
+VERSION = 1  # <- bump if the transliteration changes
+
 def transliterate_greek(text):
     """
     Transliterate greek.
     """
-    text = _strip_accents(text)
-    for gr_char, tlit_char in _MAP.items():
-        text = text.replace(gr_char, tlit_char)
-    return text
+    return unicodedata.normalize("NFD", text).translate(_TABLE)
 
 
-def _strip_accents(text):
-    text = unicodedata.normalize("NFD", text)
-    return "".join(c for c in text if unicodedata.category(c) != "Mn")
+def transliterate_many(texts):
+    """
+    Transliterate lots of greek texts (e.g. every token of a translation), only doing each
+    distinct one once.
+    """
+    tlits = {}
+    for text in texts:
+        if text not in tlits:
+            tlits[text] = transliterate_greek(text)
+    return [tlits[text] for text in texts]
+
+
+class _Table(dict):
+    """
+    Translation table for `str.translate` that also strips accents (i.e. combining marks),
+    working out (and remembering) what to do with each character the first time it's seen.
+    """
+
+    def __missing__(self, key):
+        value = self[key] = None if unicodedata.category(chr(key)) == "Mn" else key
+        return value
 
 
 _MAP = {
@@ -70,3 +87,5 @@ _MAP = {
     "\u03DC": "W",
     "\u03DD": "w",
 }
+
+_TABLE = _Table({ord(gr_char): tlit_char for gr_char, tlit_char in _MAP.items()})
@@ -1,17 +1,43 @@
 import re
 import unicodedata
 
+from functools import lru_cache
+
+
+VERSION = 1  # <- bump if the transliteration changes
 
 def transliterate_hebrew(phrase, reverse=False):
     """
     Transliterate to english.
     """
+    tlit = _transliterate(phrase)
+    return " ".join(tlit.split()[::-1]) if reverse else tlit
+
+
+def transliterate_many(phrases):
+    """
+    Transliterate lots of phrases (e.g. every token of a translation), only doing each
+    distinct one once.
+    """
+    tlits = {}
+    for phrase in phrases:
+        if phrase not in tlits:
+            tlits[phrase] = _transliterate(phrase)
+    return [tlits[phrase] for phrase in phrases]
+
+
+@lru_cache(maxsize=1 << 16)
+def _transliterate(phrase):
+    """
+    Transliterate a phrase, remembering the most recent ones since the same word forms
+    crop up over and over again.
+    """
     phrase = unicodedata.normalize("NFD", phrase)  # ensure chars and accents are separated
     phrase = _strip_cantillations(phrase)
-    tlit = "".join([_tlit(clump) for clump in _iter_clumps(phrase)])
-    for seq, sub in _TRANSLIT_SUBS:
-        tlit = re.sub(seq, sub, tlit)
-    tlit = " ".join(tlit.split()[::-1]) if reverse else tlit
+    tlit = "".join([_CLUMP_TLITS[clump] for clump in _iter_clumps(phrase)])
+    for pattern, sub in _TRANSLIT_SUBS_RE:
+        if pattern.search(tlit):
+            tlit = pattern.sub(sub, tlit)
     return tlit.lower()   # <- lower looks a bit nicer
         
 
@@ -19,8 +45,7 @@ def _strip_cantillations(phrase):
     """
     Strip all cantillations.
     """
-    phrase = _CANTILLATIONS_RE.sub("", phrase)
-    return phrase.replace(_NIQQUD["meteg"], "")  # Meteg is messing with css-font :(
+    return phrase.translate(_STRIP_TABLE)  # <- incl. meteg, which is messing with css-font :(
 
 
 def _tlit(clump):
@@ -41,18 +66,9 @@ def _iter_clumps(phrase):
     the associated accents i.e. niqqud and cantillations.
     """
     if phrase:
-        clump = phrase[0]
-        ignore = {_NIQQUD[i] for i in ["meteg", "rafe", "upper-dot", "lower-dot"]}
-        accents = set(_CANTILLATIONS.values()) | set(_NIQQUD.values())
-        for c in phrase[1:]:
-            if c in ignore:
-                continue
-            if c in accents:
-                clump += c
-            else:
-                yield _sort_clump(clump)
-                clump = c
-        yield _sort_clump(clump)
+        phrase = phrase[0] + phrase[1:].translate(_IGNORE_TABLE)
+        return _CLUMP_RE.findall(phrase)
+    return []
 
 
 def _sort_clump(clump):
@@ -71,7 +87,16 @@ def _sort_clump(clump):
     return clump[0] + "".join(sorted(clump[1:], key=key))
 
 
-_CANTILLATIONS_RE = re.compile("[\u0591-\u05AF]")
+class _ClumpTlits(dict):
+    """
+    Transliteration of each clump, worked out (and remembered) the first time it's seen.
+    """
+
+    def __missing__(self, clump):
+        tlit = self[clump] = _tlit(_sort_clump(clump))
+        return tlit
+
+
 _CANTILLATIONS = {
     "etnahta": "\u0591",
     "segol-acc": "\u0592",  # To avoid clash with the niqqud segol
@@ -289,4 +314,11 @@ _IMAP = {v: k for k, v in _MAP.items()}
 
 _CONS_TMAP = {"".join([_MAP[i] for i in k]): v for k, v in _CONS_TRANSLIT.items()}
 _VOWEL_TMAP = {"".join([_MAP[i] for i in k]): v for k, v in _VOWEL_TRANSLIT.items()}
-_PUNC_TMAP = {"".join([_MAP[i] for i in k]): v for k, v in _PUNC_TRANSLIT.items()}
\ No newline at end of file
+_PUNC_TMAP = {"".join([_MAP[i] for i in k]): v for k, v in _PUNC_TRANSLIT.items()}
+
+_TRANSLIT_SUBS_RE = [(re.compile(seq), sub) for seq, sub in _TRANSLIT_SUBS]
+_STRIP_TABLE = dict.fromkeys(map(ord, [*_CANTILLATIONS.values(), _NIQQUD["meteg"]]))
+_IGNORE_TABLE = dict.fromkeys(ord(_NIQQUD[i]) for i in ["meteg", "rafe", "upper-dot", "lower-dot"])
+_ACCENTS = "".join(set(_CANTILLATIONS.values()) | set(_NIQQUD.values()))
+_CLUMP_RE = re.compile(f"[^{_ACCENTS}][{_ACCENTS}]*|[{_ACCENTS}]+", re.DOTALL)
+_CLUMP_TLITS = _ClumpTlits()
@@ -1,26 +1,166 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
+import json
 import logging
+import os
+import threading
 import warnings
 
 from pathlib import Path
 from urllib3.exceptions import InsecureRequestWarning
+from urllib3.util.retry import Retry
 
 import requests
 
 
-_CACHE_DIR = Path(__file__).parent.parent / ".cache"
+_CACHE_DIR = Path(os.environ.get("B3_CACHE_DIR") or Path(__file__).parent.parent / ".cache")
+_CHUNK_SIZE = 1024 * 1024
+_MANIFEST_NAME = "manifest.json"
+_MANIFEST_LOCK = threading.Lock()
 
 
-def download(url, path):
+def download(url, path, revalidate=False):
     """
-    Download file from internet.
+    Download file from internet, returning True if a new copy was fetched.
+
+    The body is streamed to a temp file that is only renamed into place once complete, and
+    its checksum, size, mtime and ETag/Last-Modified headers are recorded in a manifest next
+    to it. A cached file is only trusted if it matches its manifest entry (see `_is_intact`),
+    and with `revalidate` the server is asked whether it has changed since.
     """
-    if not path.exists():
-        logging.info(f"Downloading {url}")
+    entry = _read_manifest(path.parent).get(path.name)
+    cached = path.exists() and entry and entry["url"] == url and _is_intact(path, entry)
+    if cached and not _is_unchanged(path, entry):  # <- so it's not checksummed again next time
+        entry = {**entry, "mtime_ns": path.stat().st_mtime_ns}
+        _update_manifest(path.parent, path.name, entry)
+    if cached and not revalidate:
+        return False
+
+    headers = {}
+    if cached and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if cached and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+
+    logging.info(f"Downloading {url}")
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+    sha256 = hashlib.sha256()
+    try:
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", category=InsecureRequestWarning)
-            r = requests.get(url, verify=False)
-        with path.open("wb") as f:
-            f.write(r.content)
+            with _session().get(url, headers=headers, stream=True, verify=False, timeout=60) as r:
+                if cached and r.status_code == 304:
+                    logging.info(f"{path.name} is up to date")
+                    return False
+                r.raise_for_status()
+                with tmp_path.open("wb") as f:
+                    for chunk in r.iter_content(_CHUNK_SIZE):
+                        f.write(chunk)
+                        sha256.update(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    stat = path.stat()
+    _update_manifest(path.parent, path.name, {
+        "url": url,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256.hexdigest(),
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+    })
+    return True
+
+
+def download_many(items, revalidate=False, max_workers=8):
+    """
+    Download lots of (url, path) pairs concurrently over a shared connection pool.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda item: download(*item, revalidate=revalidate), items))
+
+
+def file_sha256(path):
+    """
+    Checksum a file, trusting the download manifest if the file hasn't been touched since
+    (i.e. its size and mtime still match).
+    """
+    entry = _read_manifest(path.parent).get(path.name)
+    if entry and entry.get("sha256") and _is_unchanged(path, entry):
+        return entry["sha256"]
+    return _hash_file(path)
+
+
+def _is_intact(path, entry):
+    """
+    Whether a file still matches its manifest entry. If it's been touched since it was
+    downloaded then it's only trusted if its checksum still matches.
+    """
+    if not entry.get("sha256") or entry["size"] != path.stat().st_size:
+        return False
+    return _is_unchanged(path, entry) or entry["sha256"] == _hash_file(path)
+
+
+def _is_unchanged(path, entry):
+    stat = path.stat()
+    return entry["size"] == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+
+
+def _hash_file(path):
+    sha256 = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _session():
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _read_manifest(directory):
+    path = directory / _MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf8") as f:
+        return json.load(f)
+
+
+def _update_manifest(directory, name, entry):
+    """
+    Each cache directory has its own manifest, so only threads of one process ever share one.
+    """
+    with _MANIFEST_LOCK:
+        manifest = _read_manifest(directory)
+        manifest[name] = entry
+        write_json_atomic(directory / _MANIFEST_NAME, manifest)
+
+
+def write_json_atomic(path, blob):
+    """
+    Write json to a temp file and rename it into place, so readers never see half a file.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.part")
+    with tmp_path.open("w", encoding="utf8") as f:
+        json.dump(blob, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def parallel_map(func, items, executor=None):
+    """
+    Map a function over items (in order), fanning out to an executor if one is given.
+    """
+    if executor is None:
+        return [func(item) for item in items]
+    return list(executor.map(func, items))
 
 
 def get_cache_path(*args):
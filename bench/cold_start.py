@@ -0,0 +1,118 @@
+"""
+Measure the cold start of the lambda: how long `import api` takes (and what it spends that
+time importing, as reported by `python -X importtime`), and how long the first request of
+a few kinds takes on top, each in a fresh interpreter.
+
+    python bench/cold_start.py [--runs 5] [--budget-ms 150]
+
+Exits with an error if the median import time is over budget. Requests need the resources
+made by `python b3 build-api`, and each is skipped if any it needs aren't there (or reported
+if it fails).
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+
+API_DIR = Path(__file__).parent.parent / "api"
+
+_SNIPPET = """
+import json, time
+t0 = time.perf_counter()
+import api
+t1 = time.perf_counter()
+event = json.loads({event!r})
+if event:
+    api.handler(event, None)
+t2 = time.perf_counter()
+print("TIMES", json.dumps([t1 - t0, t2 - t1]))
+"""
+
+_REQUESTS = {
+    "books": {"path": "/books", "queryStringParameters": None},
+    "book": {"path": "/books/Gen", "queryStringParameters": None},
+    "strongs-entry": {"path": "/strongs/H1", "queryStringParameters": None},
+    "strongs-all": {"path": "/strongs", "queryStringParameters": None, "headers": {"Accept-Encoding": "gzip"}},
+}
+_RESOURCES = {  # <- what in api/resources each request needs
+    "books": ["books.json"],
+    "book": ["books.json"],
+    "strongs-entry": ["strongs.b3x"],
+    "strongs-all": ["strongs.json.gz"],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to show.")
+    args = parser.parse_args()
+
+    print("Slowest imports (cumulative, first run):")
+    for name, us in _slowest_imports(args.top):
+        print(f"  {us / 1000:8.1f}ms  {name}")
+
+    print(f"\nMedian of {args.runs} cold starts:")
+    import_ms = statistics.median(_run(None)[0] for _ in range(args.runs)) * 1000
+    print(f"  {'import api':>16}: {import_ms:8.1f}ms")
+    for name, event in _REQUESTS.items():
+        missing = [r for r in _RESOURCES[name] if not (API_DIR / "resources" / r).exists()]
+        if missing:
+            print(f"  {name:>16}: skipped as there's no {', '.join(missing)} - run `python b3 build-api` first")
+            continue
+        try:
+            ms = statistics.median(_run(event)[1] for _ in range(args.runs)) * 1000
+        except subprocess.CalledProcessError as e:
+            error = (e.stderr.strip().splitlines() or ["no output"])[-1]
+            print(f"  {name:>16}: failed with {error}")
+            continue
+        print(f"  {name:>16}: {ms:8.1f}ms + import")
+
+    if import_ms > args.budget_ms:
+        sys.exit(f"\nImport took {import_ms:.1f}ms which is over the budget of {args.budget_ms:.0f}ms")
+    print(f"\nImport is within the budget of {args.budget_ms:.0f}ms")
+
+
+def _run(event):
+    """
+    Seconds to import api and then to handle the event, in a fresh interpreter.
+    """
+    result = _python("-c", _SNIPPET.format(event=json.dumps(event)))
+    times = next(line for line in result.stdout.splitlines() if line.startswith("TIMES"))
+    return json.loads(times.split(" ", 1)[1])
+
+
+def _slowest_imports(top):
+    """
+    (module, cumulative microseconds) of the slowest modules that api imports directly.
+    """
+    report = _python("-X", "importtime", "-c", "import api").stderr
+    imports = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            imports.append((name.strip(), int(cumulative)))
+    return sorted(imports, key=lambda x: -x[1])[:top]
+
+
+def _python(*args):
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=API_DIR,
+        env={**os.environ, "AWS_DEFAULT_REGION": os.environ.get("AWS_DEFAULT_REGION", "eu-west-2")},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
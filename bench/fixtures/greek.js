@@ -0,0 +1,27 @@
+/**
+ * Strong's Greek dictionary: a few entries, laid out like the openscriptures file
+ */
+var strongsGreekDictionary = {"G444": {"strongs_def": "man-faced, i.e. a human being", "derivation": "from G435 and ὤψ (the countenance; from G3700);", "translit": "ánthrōpos", "lemma": "ἄνθρωπος", "kjv_def": "certain, man."},
+"G746": {"strongs_def": "(properly abstract) a commencement, or (concretely) chief (in various applications of order, time, place, or rank)", "derivation": "from G756;", "translit": "archḗ", "lemma": "ἀρχή", "kjv_def": "beginning, corner, (at the, the) first (estate), magistrate, power, principality, principle, rule."},
+"G846": {"strongs_def": "the reflexive pronoun self, used (alone or in the comparative G1438) of the third person, and (with the proper personal pronoun) of the other persons", "derivation": "from the particle αὖ (perhaps akin to the base of G109 through the idea of a baffling wind) (backward);", "translit": "autós", "lemma": "αὐτός", "kjv_def": "her, it(-self), one, the other, (mine) own, said, (self-), the) same, ((him-, my-, thy- )self, (your-)selves, she, that, their(-s), them(-selves), there(-at, -by, -in, -into, -of, -on, -with), they, (these) things, this (man), those, together, very, which."},
+"G1096": {"strongs_def": "to cause to be (\"gen\"-erate), i.e. (reflexively) to become (come into being), used with great latitude (literal, figurative, intensive, etc.)", "derivation": "a prolongation and middle voice form of a primary verb;", "translit": "gínomai", "lemma": "γίνομαι", "kjv_def": "arise, be assembled, be(-come, -fall, -have self), be brought (to pass), (be) come (to pass), continue, be divided, be done, draw, be ended, fall, be finished, follow, be found, be fulfilled, + God forbid, grow, happen, have, be kept, be made, be married, be ordained to be, partake, pass, be performed, be published, require, seem, be showed, X soon as it was, sound, be taken, be turned, use, wax, will, would, be wrought."},
+"G1223": {"strongs_def": "through (in very wide applications, local, causal, or occasional)", "derivation": "a primary preposition denoting the channel of an act;", "translit": "diá", "lemma": "διά", "kjv_def": "after, always, among, at, to avoid, because of (that), briefly, by, for (cause) . . . fore, from, in, by occasion of, of, by reason of, for sake, that, thereby, therefore, X though, through(-out), to, wherefore, with (-in)."},
+"G1510": {"strongs_def": "I exist (used only when emphatic)", "derivation": "the first person singular present indicative; a prolonged form of a primary and defective verb;", "translit": "eimí", "lemma": "εἰμί", "kjv_def": "am, have been, X it is I, was."},
+"G1520": {"strongs_def": "one", "derivation": "(including the neuter (etc.) ἕν) a primary numeral;", "translit": "heîs", "lemma": "εἷς", "kjv_def": "a(-n, -ny, certain), + abundantly, man, one (another), only, other, some."},
+"G1722": {"strongs_def": "i.e. a relation of rest (intermediate between G1519 and G1537); \"in,\" at, (up-)on, by, etc.", "derivation": "a primary preposition denoting (fixed) position (in place, time or state), and (by implication) instrumentality (medially or constructively);", "translit": "en", "lemma": "ἐν", "kjv_def": "about, after, against, + almost, X altogether, among, X as, at, before, between, (here-)by (+ all means), for (. . . sake of), + give self wholly to, (here-)in(-to, -wardly), X mightily, (because) of, (up-)on, (open-)ly, X outwardly, one, X quickly, X shortly, (speedi-)ly, X that, X there(-in, -on), through(-out), (un-)to(-ward), under, when, where(-with), while, with(-in)."},
+"G2222": {"strongs_def": "life (literally or figuratively)", "derivation": "from G2198;", "translit": "zōḗ", "lemma": "ζωή", "kjv_def": "life(-time)."},
+"G2316": {"strongs_def": "a deity, especially (with G3588) the supreme Divinity; figuratively, a magistrate; by Hebraism, very", "derivation": "of uncertain affinity;", "translit": "theós", "lemma": "θεός", "kjv_def": "X exceeding, God, god(-ly, -ward)."},
+"G2532": {"strongs_def": "and, also, even, so then, too, etc.; often used in connection (or composition) with other particles or small words", "derivation": "apparently, a primary particle, having a copulative and sometimes also a cumulative force;", "translit": "kaí", "lemma": "καί", "kjv_def": "and, also, both, but, even, for, if, or, so, that, then, therefore, when, yet."},
+"G2638": {"strongs_def": "to take eagerly, i.e. seize, possess, etc. (literally or figuratively)", "derivation": "from G2596 and G2983;", "translit": "katalambánō", "lemma": "καταλαμβάνω", "kjv_def": "apprehend, attain, come upon, comprehend, find, obtain, perceive, (over-)take."},
+"G3056": {"strongs_def": "something said (including the thought); by implication, a topic (subject of discourse), also reasoning (the mental faculty) or motive; by extension, a computation; specially, (with the article in John) the Divine Expression (i.e. Christ)", "derivation": "from G3004;", "translit": "lógos", "lemma": "λόγος", "kjv_def": "account, cause, communication, X concerning, doctrine, fame, X have to do, intent, matter, mouth, preaching, question, reason, + reckon, remove, say(-ing), shew, X speaker, speech, talk, thing, + none of these things move me, tidings, treatise, utterance, word, work."},
+"G3588": {"strongs_def": "the (sometimes to be supplied, at others omitted, in English idiom)", "derivation": "ἡ, hē, hay; and the neuter τό, tó, to; in all their inflections; the definite article;", "translit": "ho", "lemma": "ὁ", "kjv_def": "the, this, that, one, he, she, it, etc."},
+"G3739": {"strongs_def": "the relatively (sometimes demonstrative) pronoun, who, which, what, that", "derivation": "ἥ, hḗ, hay; and ὅ, hó, ho; probably a primary word (or perhaps a form of the article G3588);", "translit": "hós", "lemma": "ὅς", "kjv_def": "one, (an-, the) other, some, that, what, which, who(-m, -se), etc."},
+"G3756": {"strongs_def": "the absolute negative (compare G3361) adverb; no or not", "derivation": "also (before a vowel) οὐκ ouk, ook, and (before an aspirate) οὐχ ouch, ookh; a primary word;", "translit": "ou", "lemma": "οὐ", "kjv_def": "+ long, nay, neither, never, no (X man), none, (can-)not, + nothing, + special, un(-worthy), when, + without, + yet but."},
+"G3761": {"strongs_def": "not however, i.e. neither, nor, not even", "derivation": "from G3756 and G1161;", "translit": "oudé", "lemma": "οὐδέ", "kjv_def": "neither (indeed), never, no (more, nor, not), nor (yet), (also, even, then) not (even, so much as), + nothing, so much as."},
+"G3778": {"strongs_def": "the he (she or it), i.e. this or that (often with article repeated)", "derivation": "including nominative masculine plural οὗτοι, nominative feminine singular αὕτη, and nominative feminine plural αὗται; from the article G3588 and G846;", "translit": "hoûtos", "lemma": "οὗτος", "kjv_def": "he (it was that), hereof, it, she, such as, the same, these, they, this (man, same, woman), which, who."},
+"G3956": {"strongs_def": "all, any, every, the whole", "derivation": "including all the forms of declension; apparently a primary word;", "translit": "pâs", "lemma": "πᾶς", "kjv_def": "all (manner of, means), alway(-s), any (one), X daily, + ever, every (one, way), as many as, + no(-thing), X thoroughly, whatsoever, whole, whosoever."},
+"G4314": {"strongs_def": "a preposition of direction; forward to, i.e. toward (with the genitive case, the side of, i.e. pertaining to; with the dative case, by the side of, i.e. near to; usually with the accusative case, the place, time, occasion, or respect, which is the destination of the relation, i.e. whither or for which it is predicated)", "derivation": "a strengthened form of G4253;", "translit": "prós", "lemma": "πρός", "kjv_def": "about, according to, against, among, at, because of, before, between, (where-)by, for, X at thy house, in, for intent, nigh unto, of, which pertain to, that, to (the end that), X together, to (you) -ward, unto, with(-in)."},
+"G4653": {"strongs_def": "dimness, obscurity (literally or figuratively)", "derivation": "from G4655;", "translit": "skotía", "lemma": "σκοτία", "kjv_def": "dark(-ness)."},
+"G5316": {"strongs_def": "to lighten (shine), i.e. show (transitive or intransitive, literal or figurative)", "derivation": "prolongation for the base of G5457;", "translit": "phaínō", "lemma": "φαίνω", "kjv_def": "appear, seem, be seen, shine, X think."},
+"G5457": {"strongs_def": "luminousness (in the widest application, natural or artificial, abstract or concrete, literal or figurative)", "derivation": "from an obsolete φάω (to shine or make manifest, especially by rays; compare G5316, G5346);", "translit": "phôs", "lemma": "φῶς", "kjv_def": "fire, light."},
+"G5565": {"strongs_def": "at a space, i.e. separately or apart from (often as preposition)", "derivation": "adverb from G5561;", "translit": "chōrís", "lemma": "χωρίς", "kjv_def": "beside, by itself, without."}}; module.exports = strongsGreekDictionary;
@@ -0,0 +1,32 @@
+/**
+ * Strong's Hebrew dictionary: a few entries, laid out like the openscriptures file
+ */
+var strongsHebrewDictionary = {"H216": {"lemma": "אוֹר", "xlit": "ʼôwr", "pron": "ore", "derivation": "from H215;", "strongs_def": "illumination or (concrete) luminary (in every sense, including lightning, happiness, etc.)", "kjv_def": "bright, clear, + day, light (-ning), morning, sun."},
+"H259": {"lemma": "אֶחָד", "xlit": "ʼechâd", "pron": "ekh-awd'", "derivation": "a numeral from H258;", "strongs_def": "properly, united, i.e. one; or (as an ordinal) first", "kjv_def": "a, alike, alone, altogether, and, any(-thing), apiece, a certain, (dai-)ly, each (one), + eleven, every, few, first."},
+"H430": {"lemma": "אֱלֹהִים", "xlit": "ʼĕlôhîym", "pron": "el-o-heem'", "derivation": "plural of H433;", "strongs_def": "gods in the ordinary sense; but specifically used (in the plural thus, especially with the article) of the supreme God", "kjv_def": "angels, X exceeding, God (gods) (-dess, -ly), X (very) great, judges, X mighty."},
+"H559": {"lemma": "אָמַר", "xlit": "ʼâmar", "pron": "aw-mar'", "derivation": "a primitive root;", "strongs_def": "to say (used with great latitude)", "kjv_def": "answer, appoint, avouch, bid, boast self, call, certify, challenge, charge, command, say."},
+"H776": {"lemma": "אֶרֶץ", "xlit": "ʼerets", "pron": "eh'-rets", "derivation": "from an unused root probably meaning to be firm;", "strongs_def": "the earth (at large, or partitively a land)", "kjv_def": "X common, country, earth, field, ground, land, X nations, way, + wilderness, world."},
+"H853": {"lemma": "אֵת", "xlit": "ʼêth", "pron": "ayth", "derivation": "apparent contracted from H226 in the demonstrative sense of entity;", "strongs_def": "properly, self (but generally used to point out more definitely the object of a verb or preposition, even or namely)", "kjv_def": "(as such unrepresented in English)."},
+"H914": {"lemma": "בָּדַל", "xlit": "bâdal", "pron": "baw-dal'", "derivation": "a primitive root;", "strongs_def": "to divide (in variation senses literally or figuratively, separate, distinguish, differ, select, etc.)", "kjv_def": "(make, put) difference, divide (asunder), (make) separate (self, -ation), sever (out), X utterly."},
+"H922": {"lemma": "בֹּהוּ", "xlit": "bôhûw", "pron": "bo'-hoo", "derivation": "from an unused root (meaning to be empty);", "strongs_def": "a vacuity, i.e. (superficially) an undistinguishable ruin", "kjv_def": "emptiness, void."},
+"H996": {"lemma": "בֵּין", "xlit": "bêyn", "pron": "bane", "derivation": "(sometimes in the plural masculine or feminine); properly, the constructive form of an otherwise unused noun from H995;", "strongs_def": "a distinction; but used only as a preposition, between", "kjv_def": "among, asunder, at, between (-twixt . . . and), + from (the widest), X in, out of, whether (it be...or), within."},
+"H1242": {"lemma": "בֹּקֶר", "xlit": "bôqer", "pron": "bo'-ker", "derivation": "from H1239;", "strongs_def": "properly, dawn (as the break of day); generally, morning", "kjv_def": "(+) day, early, morning, morrow."},
+"H1254": {"lemma": "בָּרָא", "xlit": "bârâʼ", "pron": "baw-raw'", "derivation": "a primitive root;", "strongs_def": "(absolutely) to create; (qualified) to cut down (a wood), select, feed (as formative processes)", "kjv_def": "choose, create (creator), cut down, dispatch, do, make (fat)."},
+"H1961": {"lemma": "הָיָה", "xlit": "hâyâh", "pron": "haw-yaw", "derivation": "a primitive root (compare H1933);", "strongs_def": "to exist, i.e. be or become, come to pass (always emphatic, and not a mere copula or auxiliary)", "kjv_def": "beacon, X altogether, be(-come), accomplished, committed, like), break, cause, come (to pass), do, faint, fall, follow."},
+"H2822": {"lemma": "חֹשֶׁךְ", "xlit": "chôshek", "pron": "kho-shek'", "derivation": "from H2821;", "strongs_def": "the dark; hence (literally) darkness; figuratively, misery, destruction, death, ignorance, sorrow, wickedness", "kjv_def": "dark(-ness), night, obscurity."},
+"H2896": {"lemma": "טוֹב", "xlit": "ṭôwb", "pron": "tobe", "derivation": "from H2895;", "strongs_def": "good (as an adjective) in the widest sense; used likewise as a noun, both in the masculine and the feminine, the singular and the plural", "kjv_def": "beautiful, best, better, bountiful, cheerful, at ease, X fair (word), (be in) favour, fine, glad, good."},
+"H3117": {"lemma": "יוֹם", "xlit": "yôwm", "pron": "yome", "derivation": "from an unused root meaning to be hot;", "strongs_def": "a day (as the warm hours), whether literal (from sunrise to sunset, or from one sunset to the next), or figurative (a space of time defined by an associated term)", "kjv_def": "age, + always, + chronicals, continually(-ance), daily, ((birth-), each, to) day, (now a, two) days (agone)."},
+"H3588": {"lemma": "כִּי", "xlit": "kîy", "pron": "kee", "derivation": "a primitive particle (the full form of the prepositional prefix) indicating causal relations of all kinds, antecedent or consequent;", "strongs_def": "(by implication) very widely used as a relative conjunction or adverb (as below); often largely modified by other particles annexed", "kjv_def": "and, + (forasmuch, inasmuch, where-) as, assured(-ly), + but, certainly, doubtless, + else, even, + except, for, that."},
+"H3915": {"lemma": "לַיִל", "xlit": "layil", "pron": "lah'-yil", "derivation": "from the same as H3883;", "strongs_def": "properly, a twist (away of the light), i.e. night; figuratively, adversity", "kjv_def": "(mid-)night (season)."},
+"H4325": {"lemma": "מַיִם", "xlit": "mayim", "pron": "mah'-yim", "derivation": "dual of a primitive noun (but used in a singular sense);", "strongs_def": "water; figuratively, juice; by euphemism, urine, semen", "kjv_def": "+ piss, wasting, water(-ing, (-course, -flood, -spring))."},
+"H5921": {"lemma": "עַל", "xlit": "ʻal", "pron": "al", "derivation": "properly, the same as H5920 used as a preposition (in the singular or plural, often with prefix, or as conjunction with a particle following);", "strongs_def": "above, over, upon, or against (yet always in this last relation with a downward aspect) in a great variety of applications", "kjv_def": "above, according to(-ly), after, (as) against, among, and, X as, at, because of, beside (the rest of), upon."},
+"H6153": {"lemma": "עֶרֶב", "xlit": "ʻereb", "pron": "eh'-reb", "derivation": "from H6150;", "strongs_def": "dusk", "kjv_def": "+ day, even(-ing, tide), night."},
+"H6440": {"lemma": "פָּנִים", "xlit": "pânîym", "pron": "paw-neem'", "derivation": "plural (but always as singular) of an unused noun (paneh, from H6437);", "strongs_def": "the face (as the part that turns); used in a great variety of applications (literally and figuratively)", "kjv_def": "+ accept, a-(be-)fore(-time), against, anger, X as (long as), at, + battle, + because (of), face, presence."},
+"H7121": {"lemma": "קָרָא", "xlit": "qârâʼ", "pron": "kaw-raw'", "derivation": "a primitive root (rather identical with H7122 through the idea of accosting a person met);", "strongs_def": "to call out to (i.e. properly, address by name, but used in a wide variety of applications)", "kjv_def": "bewray (self), that are bidden, call (for, forth, self, upon), cry (unto), (be) famous, guest, invite, mention, (give) name."},
+"H7200": {"lemma": "רָאָה", "xlit": "râʼâh", "pron": "raw-aw'", "derivation": "a primitive root;", "strongs_def": "to see, literally or figuratively (in numerous applications, direct and implied, transitive, intransitive and causative)", "kjv_def": "advise self, appear, approve, behold, X certainly, consider, discern, (make to) enjoy, have experience, gaze, see."},
+"H7225": {"lemma": "רֵאשִׁית", "xlit": "rêʼshîyth", "pron": "ray-sheeth'", "derivation": "from the same as H7218;", "strongs_def": "the first, in place, time, order or rank (specifically, a firstfruit)", "kjv_def": "beginning, chief(-est), first(-fruits, part, time), principal thing."},
+"H7307": {"lemma": "רוּחַ", "xlit": "rûwach", "pron": "roo'-akh", "derivation": "from H7306;", "strongs_def": "wind; by resemblance breath, i.e. a sensible (or even violent) exhalation; figuratively, life, anger, unsubstantiality; by extension, a region of the sky; by resemblance spirit", "kjv_def": "air, anger, blast, breath, X cool, courage, mind, X quarter, X side, spirit((-ual)), tempest, X vain, ((whirl-)) wind(-y)."},
+"H7363": {"lemma": "רָחַף", "xlit": "râchaph", "pron": "raw-khaf'", "derivation": "a primitive root;", "strongs_def": "to brood; by implication, to be relaxed", "kjv_def": "flutter, move, shake."},
+"H8064": {"lemma": "שָׁמַיִם", "xlit": "shâmayim", "pron": "shaw-mah'-yim", "derivation": "dual of an unused singular shameh; from an unused root meaning to be lofty;", "strongs_def": "the sky (as aloft; the dual perhaps alluding to the visible arch in which the clouds move, as well as to the higher ether where the celestial bodies revolve)", "kjv_def": "air, X astrologer, heaven(-s)."},
+"H8414": {"lemma": "תֹּהוּ", "xlit": "tôhûw", "pron": "to'-hoo", "derivation": "from an unused root meaning to lie waste;", "strongs_def": "a desolation (of surface), i.e. desert; figuratively, a worthless thing; adverbially, in vain", "kjv_def": "confusion, empty place, without form, nothing, (thing of) nought, vain, vanity, waste, wilderness."},
+"H8415": {"lemma": "תְּהוֹם", "xlit": "tᵉhôwm", "pron": "teh-home'", "derivation": "(usually feminine) from H1949;", "strongs_def": "an abyss (as a surging mass of water), especially the deep (the main sea or the subterranean water-supply)", "kjv_def": "deep (place), depth."}}; module.exports = strongsHebrewDictionary;
@@ -0,0 +1,151 @@
+"""
+Load generator for the api (e.g. as run locally by `python bench/serve.py`), replaying a mix
+of chapter reads, range reads, paginated searches and strongs lookups and reporting the
+throughput and latency percentiles of each.
+
+    python bench/loadgen.py [--url http://127.0.0.1:8000] [--concurrency 8] [--duration 20]
+                            [--mix chapter=4,range=2,search=3,strongs=1]
+"""
+import argparse
+import asyncio
+from collections import Counter, defaultdict
+import gzip
+import json
+import random
+import time
+from urllib.parse import urlsplit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=8, help="Number of concurrent clients.")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run for.")
+    parser.add_argument("--mix", default="chapter=4,range=2,search=3,strongs=1", help="Relative weights of each kind of request.")
+    parser.add_argument("--books", default="Gen,Exod,Ps,Prov,Isa,Matt,John,Rom", help="Books to read chapters of.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    mix = {kind: float(weight) for kind, _, weight in (part.partition("=") for part in args.mix.split(","))}
+    unknown = set(mix) - set(_TRAFFIC)
+    if unknown:
+        parser.error(f"Unknown kinds of request: {', '.join(sorted(unknown))}")
+    asyncio.run(run(args.url, args.concurrency, args.duration, mix, args.books.split(","), args.seed))
+
+
+async def run(url, concurrency, duration, mix, books, seed):
+    url = urlsplit(url)
+    rng = random.Random(seed)
+    async with _Connection(url.hostname, url.port or 80) as conn:
+        _, headers, body = await conn.get("/books")
+    if headers.get("content-encoding") == "gzip":
+        body = gzip.decompress(body)
+    chapters = {
+        book["code"]: book["chapters"]
+        for collection in json.loads(body)
+        for book in collection["books"]
+        if book["code"] in books
+    }
+
+    latencies = defaultdict(list)
+    statuses = Counter()
+    nbytes = Counter()
+    deadline = time.perf_counter() + duration
+
+    async def client(i):
+        rng_i = random.Random(rng.random())
+        async with _Connection(url.hostname, url.port or 80) as conn:
+            while time.perf_counter() < deadline:
+                kind = rng_i.choices(list(mix), weights=list(mix.values()))[0]
+                path = _TRAFFIC[kind](rng_i, chapters)
+                t0 = time.perf_counter()
+                status, _, body = await conn.get(path)
+                latencies[kind].append(time.perf_counter() - t0)
+                statuses[status] += 1
+                nbytes[kind] += len(body)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    _report(latencies, statuses, nbytes, time.perf_counter() - started, concurrency)
+
+
+def _chapter(rng, chapters):
+    code = rng.choice(list(chapters))
+    c = rng.randint(1, chapters[code])
+    return f"/books/{code}/{c}.1/{c}.x"
+
+
+def _range(rng, chapters):
+    code = rng.choice(list(chapters))
+    c1 = rng.randint(1, chapters[code])
+    c2 = min(chapters[code], c1 + rng.randint(1, 4))
+    return f"/books/{code}/{c1}.{rng.randint(1, 5)}/{c2}.x"
+
+
+def _search(rng, chapters):
+    # Low numbers are the common words, so have more of them
+    lan, top = rng.choice([("H", 8674), ("G", 5624)])
+    term = f"{lan}{min(top, int(rng.paretovariate(0.6)))}"
+    return f"/search?term={term}&size=20&page={rng.choice([1, 1, 1, 2, 3])}"
+
+
+def _strongs(rng, chapters):
+    ids = [f"{rng.choice('HG')}{rng.randint(1, 5000)}" for _ in range(rng.randint(1, 20))]
+    return f"/strongs/{ids[0]}" if len(ids) == 1 else f"/strongs?ids={','.join(ids)}"
+
+
+_TRAFFIC = {"chapter": _chapter, "range": _range, "search": _search, "strongs": _strongs}
+
+
+def _report(latencies, statuses, nbytes, elapsed, concurrency):
+    total = sum(len(v) for v in latencies.values())
+    print(f"{total:,} requests in {elapsed:.1f}s with {concurrency} clients: {total / elapsed:,.1f} req/s")
+    print(f"Statuses: {dict(sorted(statuses.items()))}")
+    print(f"{'kind':>8} {'count':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'KB/req':>8}")
+    everything = [x for v in latencies.values() for x in v]
+    for kind, values in sorted(latencies.items()) + [("all", everything)]:
+        values = sorted(values)
+        kb = (sum(nbytes.values()) if kind == "all" else nbytes[kind]) / max(len(values), 1) / 1024
+        print(
+            f"{kind:>8} {len(values):>7,} {len(values) / elapsed:>8,.1f} "
+            + " ".join(f"{_percentile(values, p) * 1000:>6.1f}ms" for p in (50, 95, 99, 100))
+            + f" {kb:>8,.1f}"
+        )
+
+
+def _percentile(values, p):
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+class _Connection:
+    """
+    Minimal keep-alive HTTP/1.1 client connection.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    async def __aenter__(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.writer.close()
+
+    async def get(self, path):
+        request = f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\nAccept-Encoding: gzip\r\n\r\n"
+        self.writer.write(request.encode("latin1"))
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        return status, headers, body
+
+
+if __name__ == "__main__":
+    main()
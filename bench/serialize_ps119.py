@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of reading and encoding a big chapter (Ps.119) in the api, comparing:
+
+- old: boto3's resource deserializer (Decimal numbers) and json with a DecimalEncoder
+- new: the api's int deserializer and its encoder (orjson if installed)
+- spliced: joining the cached json fragments of each verse
+
+Uses the staged translations if there are any, else made-up verses of a similar size.
+
+    python bench/serialize_ps119.py
+"""
+import decimal
+import json
+import os
+from pathlib import Path
+import random
+import sys
+import timeit
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-2")
+root = Path(__file__).parent.parent
+sys.path[:0] = [str(root), str(root / "api")]
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+import api
+
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, o):
+        if isinstance(o, decimal.Decimal):
+            return int(o)
+        return super().default(o)
+
+
+def main():
+    verses = _staged_verses("Ps.119") or _fake_verses("Ps.119", 176)
+    serializer = TypeSerializer()
+    raw = [{k: serializer.serialize(v) for k, v in verse.items()} for verse in verses]
+    old_deserializer = TypeDeserializer()
+
+    def old():
+        items = [{k: old_deserializer.deserialize(v) for k, v in item.items()} for item in raw]
+        return json.dumps({"verses": [api._shape(item) for item in items]}, cls=DecimalEncoder)
+
+    def new():
+        items = [api._from_item(item) for item in raw]
+        return api._dumps({"verses": [api._shape(item) for item in items]})
+
+    fragments = [api._dumps(api._shape(api._from_item(item))) for item in raw]
+
+    def spliced():
+        return f'{{"verses":[{",".join(fragments)}]}}'
+
+    assert json.loads(old()) == json.loads(new()) == json.loads(spliced())
+    print(f"{len(verses)} verses, {len(new()) / 2**20:.2f}MB of json, orjson={'yes' if api.orjson else 'no'}")
+    for name, func in [("old", old), ("new", new), ("spliced", spliced)]:
+        n, total = timeit.Timer(func).autorange()
+        print(f"{name:>8}: {total / n * 1000:8.2f}ms")
+
+
+def _staged_verses(chapter_id):
+    from b3 import bibles, staging
+    if not any(staging.exists(tr) for tr in bibles.TRANSLATIONS):
+        return None
+    return [verse for verse in bibles.iter_verses(in_scope=lambda cid: cid == chapter_id)] or None
+
+
+def _fake_verses(chapter_id, n):
+    rng = random.Random(119)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 9))) for _ in range(500)]
+    verses = []
+    for vnum in range(1, n + 1):
+        verse = {"chapterId": chapter_id, "verseNum": vnum}
+        for translation, lan in api._TRANSLATIONS.items():
+            tokens = []
+            for _ in range(rng.randint(15, 30)):
+                token = {"text": rng.choice(words), "type": "w"}
+                if lan != "en":
+                    token["strongs"] = [f"{'H' if lan == 'he' else 'G'}{rng.randint(1, 8000)}"]
+                    token["tlit"] = rng.choice(words)
+                tokens += [token, {"text": " ", "type": "punc"}]
+            verse[translation] = {"lan": lan, "tokens": tokens}
+        verses.append(verse)
+    return verses
+
+
+if __name__ == "__main__":
+    main()
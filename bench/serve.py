@@ -0,0 +1,196 @@
+"""
+Run the api locally: wraps `api.handler` in an asyncio HTTP server, with an in-memory
+stand-in for dynamodb seeded from the staged translations (and search terms).
+
+    python bench/serve.py [--port 8000] [--filt Gen,Ps,Matt]
+
+Strongs routes need the resources made by `python b3 build-api`, and verses are served from
+the verse store instead of the stand-in if it was built with `--with-verses`. Then load it
+with `python bench/loadgen.py`.
+"""
+import argparse
+import asyncio
+import atexit
+import base64
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+root = Path(__file__).parent.parent
+sys.path[:0] = [str(root), str(root / "api")]
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-2")
+
+from boto3.dynamodb.types import TypeSerializer
+
+from b3 import bibles, postings, strongs
+from b3.books import get_books
+
+
+_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class LocalDynamo:
+    """
+    In-memory stand-in for the few dynamodb client calls the api makes.
+    """
+
+    def __init__(self, verses, terms):
+        serializer = TypeSerializer()
+        self.chapters = {}
+        for verse in verses:
+            item = {k: serializer.serialize(v) for k, v in verse.items()}
+            self.chapters.setdefault(verse["chapterId"], {})[verse["verseNum"]] = item
+        self.terms = {term: {"term": {"S": term}, "postings": {"B": blob}} for term, blob in terms.items()}
+
+    def query(self, TableName, KeyConditionExpression, ExpressionAttributeValues, **kwargs):
+        values = {k: next(iter(v.values())) for k, v in ExpressionAttributeValues.items()}
+        start, end = int(values.get(":s", 0)), int(values.get(":e", 1 << 30))
+        verses = self.chapters.get(values[":c"], {})
+        items = [item for vnum, item in sorted(verses.items()) if start <= vnum <= end]
+        return {"Items": [_project(item, kwargs) for item in items]}
+
+    def get_item(self, TableName, Key):
+        item = self.terms.get(Key["term"]["S"])
+        return {"Item": item} if item else {}
+
+    def batch_get_item(self, RequestItems, **kwargs):
+        request = RequestItems["B3Bibles"]
+        items = []
+        for key in request["Keys"]:
+            item = self.chapters.get(key["chapterId"]["S"], {}).get(int(key["verseNum"]["N"]))
+            if item:
+                items.append(_project(item, request))
+        return {"Responses": {"B3Bibles": items}, "UnprocessedKeys": {}}
+
+
+def _project(item, request):
+    if "ProjectionExpression" not in request:
+        return item
+    names = request["ExpressionAttributeNames"]
+    attrs = {names[name.strip()] for name in request["ProjectionExpression"].split(",")}
+    return {k: v for k, v in item.items() if k in attrs}
+
+
+def load_api(filt=None):
+    """
+    Import the api, pointing it at a local dynamodb seeded from staging.
+    """
+    import api
+
+    in_scope = bibles.scope(filt) if filt else None
+    logging.info("Seeding local dynamodb from staging")
+    verses = list(bibles.iter_verses(in_scope=in_scope))
+    terms = {}
+    for lan in ["hebrew", "greek"]:
+        try:
+            index = strongs.get_postings(lan)
+        except RuntimeError as e:
+            logging.warning(f"No {lan} search terms: {e}")
+            continue
+        for term, plist in index.items():
+            plist = [p for p in plist if in_scope is None or in_scope(postings.verse_ref(p[0]).rsplit(".", 1)[0])]
+            if plist:
+                terms[term] = postings.encode(plist)
+    local = LocalDynamo(verses, terms)
+    logging.info(f"...{len(verses):,} verses in {len(local.chapters):,} chapters and {len(terms):,} search terms")
+    api.dynamodb = lambda: local
+
+    resources = api.resources_dir
+    if not (resources / "books.json").exists():
+        # Point the api at a temp copy with books.json added, rather than writing to the tree
+        tmp = Path(tempfile.mkdtemp(prefix="b3-resources-"))
+        atexit.register(shutil.rmtree, tmp, ignore_errors=True)
+        if resources.exists():
+            for path in resources.iterdir():
+                (tmp / path.name).symlink_to(path.resolve())
+        (tmp / "books.json").write_text(json.dumps(get_books()), encoding="utf8")
+        api.resources_dir = resources = tmp
+    if not (resources / "strongs.b3x").exists():
+        logging.warning("No strongs resources so /strongs won't work - run `python b3 build-api` first")
+    return api
+
+
+async def serve(api, host, port):
+    async def handle(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin1").partition(":")
+                    headers[name.strip()] = value.strip()
+                length = int(headers.get("Content-Length", 0))
+                if length:
+                    await reader.readexactly(length)
+
+                url = urlsplit(target)
+                event = {
+                    "httpMethod": method,
+                    "path": url.path,
+                    "queryStringParameters": dict(parse_qsl(url.query)) or None,
+                    "headers": headers,
+                }
+                t0 = time.perf_counter()
+                try:
+                    response = await asyncio.to_thread(api.handler, event, None)
+                except Exception:
+                    logging.exception(f"Failed on {target}")
+                    response = {"statusCode": "500", "body": "", "headers": {}}
+                elapsed = (time.perf_counter() - t0) * 1000
+                logging.debug(f"{method} {target} -> {response['statusCode']} in {elapsed:.1f}ms")
+
+                body = response["body"]
+                body = base64.b64decode(body) if response.get("isBase64Encoded") else body.encode("utf8")
+                code = int(response["statusCode"])
+                head = [f"HTTP/1.1 {code} {_REASONS.get(code, '')}"]
+                head += [f"{k}: {v}" for k, v in response["headers"].items()]
+                head += [f"Content-Length: {len(body)}", f"X-Handler-Ms: {elapsed:.2f}"]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin1") + body)
+                await writer.drain()
+                if headers.get("Connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logging.info(f"Serving the api on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--filt", help="Only seed some books/chapters, e.g. Gen,Ps.119")
+    parser.add_argument("--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args()
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s : %(levelname)s : %(message)s",
+    )
+    api = load_api(args.filt)
+    if not args.verbose:
+        # The api logs every request (as lambda wants), which would slow down load tests
+        import cache
+        api.print = cache.print = lambda *args, **kwargs: None
+    try:
+        asyncio.run(serve(api, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark the stages of the staging pipeline - parsing, transliterating, the lxx, strongs
+and merging translations for upload - over the fixtures in bench/fixtures, reporting the
+time per call (best of a few rounds) and peak memory (from tracemalloc) of each.
+
+    python bench/staging.py [--rounds 5] [--only osis] [--save base.json] [--compare base.json]
+
+The fixtures are put in a throwaway cache (via B3_CACHE_DIR) as though they'd been
+downloaded, so this never touches the network or the real `.cache`. With `--compare` it
+exits with an error if any stage is slower or uses more memory than `--tolerance` allows.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+root = Path(__file__).parent.parent
+sys.path.insert(0, str(root))
+os.environ["B3_CACHE_DIR"] = tempfile.mkdtemp(prefix="b3-bench-")
+
+from b3 import bibles, lxx, staging, strongs
+from b3.openscriptures import fetch_hewlc_book
+from b3.parser.osis import parse_osis
+from b3.parser.usfx import parse_usfx
+from b3.translit import hebrew, transliterate_greek, transliterate_hebrew
+from b3.utils import _hash_file, _update_manifest, get_cache_path
+
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--only", help="Only run stages with this in their name.")
+    parser.add_argument("--save", type=Path, help="Save the results as json, e.g. as a baseline.")
+    parser.add_argument("--compare", type=Path, help="Compare with results saved by --save.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed fractional slowdown/growth.")
+    args = parser.parse_args()
+
+    try:
+        stages = _stages()
+        results = {}
+        print(f"{'stage':>24} {'ms/call':>10} {'peak KB':>10}")
+        for name, func in stages.items():
+            if args.only and args.only not in name:
+                continue
+            results[name] = {"ms": _time(func, args.rounds), "peak_kb": _peak_kb(func)}
+            print(f"{name:>24} {results[name]['ms']:>10.3f} {results[name]['peak_kb']:>10.1f}")
+    finally:
+        shutil.rmtree(os.environ["B3_CACHE_DIR"], ignore_errors=True)
+
+    if args.save:
+        blob = {"python": platform.python_version(), "stages": results}
+        args.save.write_text(json.dumps(blob, indent=2), encoding="utf8")
+        print(f"\nSaved to {args.save}")
+    if args.compare:
+        regressions = _compare(json.loads(args.compare.read_text(encoding="utf8"))["stages"], results, args.tolerance)
+        if regressions:
+            sys.exit("\nRegressions:\n" + "\n".join(f"  {r}" for r in regressions))
+        print(f"\nNo regressions against {args.compare}")
+
+
+def _stages():
+    """
+    Install the fixtures in the cache, stage them and return the stages to time by name.
+    """
+    gen_osis = _install("gen_osis.xml", get_cache_path("raw", "hewlc", "gen_osis.xml"))
+    gen_par = _install("01.Genesis.par", lxx._path("01.Genesis"))
+    for lan in ["hebrew", "greek"]:
+        _install(f"{lan}.js", strongs._js_path(lan), url=strongs._STRONGS_OS_URL.format(lan=lan))
+    kjv_usfx = FIXTURES / "kjv_usfx.xml"
+    john_osis = FIXTURES / "john_osis.xml"
+
+    grtisch = parse_osis(john_osis, w_tag_parser="greek")
+    for record in grtisch:
+        for token in record["tokens"]:
+            token["tlit"] = transliterate_greek(token["text"])
+    staging.save(parse_usfx(kjv_usfx), "enkjv")
+    staging.save(fetch_hewlc_book("Gen"), "hewlc")
+    staging.save(grtisch, "grtisch")
+    staging.save(lxx.create_lxx_book("Gen"), "grlxx")
+
+    hebrew_words = _texts(parse_osis(gen_osis, w_tag_parser="hebrew"))
+    greek_words = _texts(grtisch) + _texts(lxx._parse("Gen", gen_par))
+    return {
+        "parse_usfx": lambda: parse_usfx(kjv_usfx),
+        "parse_osis[hebrew]": lambda: parse_osis(gen_osis, w_tag_parser="hebrew"),
+        "parse_osis[greek]": lambda: parse_osis(john_osis, w_tag_parser="greek"),
+        "transliterate_hebrew": lambda: _cold_hebrew() or [transliterate_hebrew(text) for text in hebrew_words],
+        "transliterate_greek": lambda: [transliterate_greek(text) for text in greek_words],
+        "lxx._parse": lambda: list(lxx._parse("Gen", gen_par)),
+        "get_references[hebrew]": lambda: strongs.get_references("hebrew"),
+        "get_references[greek]": lambda: strongs.get_references("greek"),
+        "strongs": strongs.fetch_strongs_from_openscriptures,
+        "merge": lambda: list(bibles.iter_verses(["enkjv", "hewlc", "grlxx", "grtisch"])),
+    }
+
+
+def _install(name, path, url=None):
+    """
+    Copy a fixture to where it would've been downloaded to (and record it as downloaded
+    from `url`, if it goes through `utils.download`).
+    """
+    shutil.copyfile(FIXTURES / name, path)
+    if url:
+        stat = path.stat()
+        _update_manifest(path.parent, path.name, {
+            "url": url, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _hash_file(path),
+        })
+    return path
+
+
+def _cold_hebrew():
+    """
+    Forget the hebrew transliterations of earlier calls, so each call starts from scratch.
+    """
+    hebrew._transliterate.cache_clear()
+    hebrew._CLUMP_TLITS.clear()
+
+
+def _texts(records):
+    return [token["text"] for record in records for token in record["tokens"]]
+
+
+def _time(func, rounds):
+    """
+    Best milliseconds per call over a few rounds, each of enough calls to take 0.2s or so.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=rounds, number=number)) / number * 1000
+
+
+def _peak_kb(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _compare(baseline, results, tolerance):
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric, unit in [("ms", "ms"), ("peak_kb", "KB")]:
+            before, after = baseline[name][metric], result[metric]
+            if after > before * (1 + tolerance):
+                regressions.append(f"{name}: {before:.3f}{unit} -> {after:.3f}{unit} ({after / before - 1:+.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    main()
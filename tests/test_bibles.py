@@ -0,0 +1,29 @@
+from b3 import bibles
+
+
+class _Staged:
+    """Stand-in for a staged translation, with its verses by chapter."""
+
+    def __init__(self, *verses):
+        self.verses = verses
+
+    def chapter(self, chapter_id):
+        return [{"verseNum": vnum, "tokens": tokens} for cid, vnum, tokens in self.verses if cid == chapter_id]
+
+
+def test_merge_chapter():
+    staged = {
+        "enkjv": _Staged(("Gen.1", 2, ["b"]), ("Gen.1", 1, ["a"])),
+        "hewlc": _Staged(("Gen.1", 1, ["א"])),
+    }
+    assert list(bibles._merge_chapter("Gen.1", staged)) == [
+        {"chapterId": "Gen.1", "verseNum": 1, "KJV": {"lan": "en", "tokens": ["a"]}, "WLC": {"lan": "he", "tokens": ["א"]}},
+        {"chapterId": "Gen.1", "verseNum": 2, "KJV": {"lan": "en", "tokens": ["b"]}},
+    ]
+
+
+def test_merge_chapter_joins_repeated_verses():
+    staged = {"enkjv": _Staged(("Ps.3", 1, ["a", "b"]), ("Ps.3", 2, ["c"]), ("Ps.3", 1, ["d"]))}
+    verses = list(bibles._merge_chapter("Ps.3", staged))
+    assert [v["KJV"]["tokens"] for v in verses] == [["a", "b", "d"], ["c"]]
+    assert staged["enkjv"].verses[0][2] == ["a", "b"]  # <- not changed in place
@@ -0,0 +1,96 @@
+import boto3
+from moto import mock_aws
+import pytest
+
+from b3 import bibles, ledger, utils
+from b3.db import upload
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    """An empty B3Bibles table in moto, with ledgers kept in a temp cache dir."""
+    monkeypatch.setattr(utils, "_CACHE_DIR", tmp_path)
+    for name, value in [("AWS_ACCESS_KEY_ID", "x"), ("AWS_SECRET_ACCESS_KEY", "x"), ("AWS_DEFAULT_REGION", "eu-west-2")]:
+        monkeypatch.setenv(name, value)
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb")
+        yield dynamodb.create_table(
+            TableName="B3Bibles",
+            KeySchema=[
+                {"AttributeName": "chapterId", "KeyType": "HASH"},
+                {"AttributeName": "verseNum", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "chapterId", "AttributeType": "S"},
+                {"AttributeName": "verseNum", "AttributeType": "N"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+
+def test_plan_counts_and_scoped_deletes(table):
+    _upload([_verse("Gen.1", 1), _verse("Gen.1", 2), _verse("Gen.1", 3), _verse("Ps.1", 1)])
+    assert _keys(table) == {("Gen.1", 1), ("Gen.1", 2), ("Gen.1", 3), ("Ps.1", 1)}
+
+    # Ps.1 isn't in the records, but it's outside the filter so it's kept
+    records = [_verse("Gen.1", 1, "changed"), _verse("Gen.1", 2), _verse("Gen.2", 1)]
+    counts = _upload(records, in_scope=bibles.scope("Gen"))
+    assert counts == {"new": 1, "changed": 1, "deleted": 1, "unchanged": 1}
+    assert _keys(table) == {("Gen.1", 1), ("Gen.1", 2), ("Gen.2", 1), ("Ps.1", 1)}
+    assert _item(table, "Gen.1", 1)["text"] == "changed"
+    assert len(ledger.load("B3Bibles")) == 4
+
+    # Nothing's changed, so nothing's sent
+    counts = _upload(records, in_scope=bibles.scope("Gen"))
+    assert counts == {"new": 0, "changed": 0, "deleted": 0, "unchanged": 3}
+
+
+def test_interrupted_upload_resumes(table):
+    records = [_verse("Gen.1", vnum) for vnum in range(1, 201)]
+    calls = []
+
+    def interrupt(requests):
+        calls.append(requests)
+        if len(calls) == 3:
+            raise RuntimeError("Interrupted")
+
+    with pytest.raises(RuntimeError, match="Interrupted"):
+        _upload(records, on_written=interrupt)
+    written = len(ledger.load("B3Bibles"))
+    assert 0 < written < len(records)
+
+    # Only what wasn't checkpointed gets sent again
+    counts = _upload(records)
+    assert counts == {"new": len(records) - written, "changed": 0, "deleted": 0, "unchanged": written}
+    assert len(_keys(table)) == len(records)
+    assert len(ledger.load("B3Bibles")) == len(records)
+
+
+def _upload(records, in_scope=None, on_written=None):
+    """Upload the way `b3 upload-bibles` does, returning the plan's counts."""
+    previous = ledger.load("B3Bibles")
+    plan = ledger.plan(records, "B3Bibles", previous, in_scope=in_scope)
+    checkpoint = ledger.Checkpoint("B3Bibles", previous, plan["digests"])
+
+    def written(requests):
+        checkpoint(requests)
+        if on_written:
+            on_written(requests)
+
+    try:
+        upload(plan["puts"], table="B3Bibles", deletes=plan["deletes"], workers=1, on_written=written)
+    finally:
+        checkpoint.save()
+    return plan["counts"]
+
+
+def _verse(chapter_id, verse_num, text="text"):
+    return {"chapterId": chapter_id, "verseNum": verse_num, "text": text}
+
+
+def _keys(table):
+    return {(item["chapterId"], int(item["verseNum"])) for item in table.scan()["Items"]}
+
+
+def _item(table, chapter_id, verse_num):
+    return table.get_item(Key={"chapterId": chapter_id, "verseNum": verse_num})["Item"]
@@ -0,0 +1,29 @@
+from b3 import staging
+
+
+def _round_trip(records, tmp_path):
+    path = tmp_path / "test.b3s"
+    staging.write(records, path)
+    with staging.StagingFile(path) as f:
+        return list(f)
+
+
+def test_round_trip(tmp_path):
+    records = [
+        {"chapterId": "Gen.1", "verseNum": 1, "tokens": [
+            {"type": "word", "text": "In", "strongs": ["H7225"], "tlit": "in"},
+            {"type": "punc", "text": " "},
+        ]},
+        {"chapterId": "Gen.1", "verseNum": 2, "tokens": [{"type": "word", "text": "In", "strongs": ["H7225"], "tlit": "in"}]},
+        {"chapterId": "Gen.2", "verseNum": 1, "tokens": []},
+    ]
+    assert _round_trip(records, tmp_path) == records
+
+
+def test_round_trip_none(tmp_path):
+    # e.g. an empty <w/> in a USFX file has no text
+    records = [{"chapterId": "Gen.1", "verseNum": 1, "tokens": [
+        {"type": "w", "text": None},
+        {"type": None, "text": "a"},
+    ]}]
+    assert _round_trip(records, tmp_path) == records
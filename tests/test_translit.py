@@ -0,0 +1,38 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from b3.translit import greek, hebrew
+
+
+GOLDEN = Path(__file__).parent / "golden"
+
+
+def _golden(name):
+    """Rows of [input, expected output, ...] made with the original transliterators."""
+    with (GOLDEN / f"{name}.json").open(encoding="utf8") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("text, expected", _golden("greek"))
+def test_greek(text, expected):
+    assert greek.transliterate_greek(text) == expected
+
+
+def test_greek_many():
+    texts, expected = zip(*_golden("greek"))
+    assert greek.transliterate_many(list(texts) * 2) == list(expected) * 2
+
+
+@pytest.mark.parametrize("phrase, expected, reversed_", _golden("hebrew"))
+def test_hebrew(phrase, expected, reversed_):
+    assert hebrew.transliterate_hebrew(phrase) == expected
+    assert hebrew.transliterate_hebrew(phrase, reverse=True) == reversed_
+
+
+def test_hebrew_many():
+    phrases, expected, _ = zip(*_golden("hebrew"))
+    hebrew._transliterate.cache_clear()
+    hebrew._CLUMP_TLITS.clear()
+    assert hebrew.transliterate_many(list(phrases) * 2) == list(expected) * 2
@@ -0,0 +1,93 @@
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import os
+import threading
+
+import pytest
+
+from b3 import utils
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serve a directory over http on localhost, returning it and its url."""
+    root = tmp_path / "www"
+    root.mkdir()
+    handler = partial(_Handler, directory=str(root))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield root, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        _Handler.requests.append(self.headers.get("If-Modified-Since"))
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(root, name, body, mtime):
+    path = root / name
+    path.write_bytes(body)
+    os.utime(path, (mtime, mtime))
+
+
+def test_download_is_cached_and_revalidated(server, tmp_path):
+    root, url = server
+    _serve(root, "a.txt", b"first", 1_600_000_000)
+    path = tmp_path / "a.txt"
+    _Handler.requests.clear()
+
+    assert utils.download(f"{url}/a.txt", path)
+    assert path.read_bytes() == b"first"
+    entry = utils._read_manifest(tmp_path)["a.txt"]
+    assert entry["sha256"] == utils._hash_file(path)
+    assert entry["last_modified"]
+
+    # Cached, so the server isn't asked at all
+    assert not utils.download(f"{url}/a.txt", path)
+    assert len(_Handler.requests) == 1
+
+    # Revalidated, and the server says it's not modified
+    assert not utils.download(f"{url}/a.txt", path, revalidate=True)
+    assert _Handler.requests[-1] == entry["last_modified"]
+
+    # Revalidated after it's changed on the server
+    _serve(root, "a.txt", b"second", 1_700_000_000)
+    assert utils.download(f"{url}/a.txt", path, revalidate=True)
+    assert path.read_bytes() == b"second"
+
+
+def test_corrupted_download_is_fetched_again(server, tmp_path):
+    root, url = server
+    _serve(root, "a.txt", b"first", 1_600_000_000)
+    path = tmp_path / "a.txt"
+    assert utils.download(f"{url}/a.txt", path)
+    sha256 = utils.file_sha256(path)
+
+    # Flip a byte without changing the size
+    path.write_bytes(b"firsT")
+    assert utils.file_sha256(path) != sha256
+    assert utils.download(f"{url}/a.txt", path)
+    assert path.read_bytes() == b"first"
+    assert utils.file_sha256(path) == sha256
+
+
+def test_touched_download_is_still_trusted(server, tmp_path):
+    root, url = server
+    _serve(root, "a.txt", b"first", 1_600_000_000)
+    path = tmp_path / "a.txt"
+    assert utils.download(f"{url}/a.txt", path)
+
+    os.utime(path, (1_500_000_000, 1_500_000_000))
+    _Handler.requests.clear()
+    assert not utils.download(f"{url}/a.txt", path)
+    assert not _Handler.requests
+    assert utils._read_manifest(tmp_path)["a.txt"]["mtime_ns"] == path.stat().st_mtime_ns